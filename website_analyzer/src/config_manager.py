@@ -121,6 +121,9 @@ class ConfigManager:
                 "formats": ["html", "pdf"],
                 "include_screenshots": True,
                 "report_title": "Website Analysis Report"
+            },
+            "performance": {
+                "enabled": False
             }
         }
     
@@ -135,7 +138,8 @@ class ConfigManager:
             "BROWSER_HEADLESS": ("browser", "headless"),
             "MAX_PAGES_PER_BATCH": ("analysis", "batch_size"),
             "SCREENSHOT_QUALITY": None,  # 暫時不對應到配置
-            "REPORT_OUTPUT_DIR": ("output", "output_dir")
+            "REPORT_OUTPUT_DIR": ("output", "output_dir"),
+            "PERFORMANCE_MONITORING": ("performance", "enabled")
         }
         
         for env_key, config_path in env_mappings.items():
@@ -146,7 +150,7 @@ class ConfigManager:
                     self._config[section] = {}
                 
                 # 類型轉換
-                if key == "headless":
+                if key in ["headless", "enabled"]:
                     env_value = env_value.lower() == "true"
                 elif key in ["batch_size", "max_pages"]:
                     env_value = int(env_value)
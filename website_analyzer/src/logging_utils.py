@@ -3,15 +3,38 @@ Logging utilities for the Website Analyzer system.
 Provides structured logging with different handlers and formatters.
 """
 
+import atexit
+import copy
 import logging
 import logging.handlers
-import json
+import queue
 import sys
-from datetime import datetime
+import threading
+import time
+from collections import OrderedDict
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Callable, Dict, Any, Optional, Tuple
 import traceback
 
+import orjson
+
+
+# Attributes present on every LogRecord; anything else came in through `extra`
+_RESERVED_RECORD_ATTRS = frozenset(
+    vars(logging.LogRecord('', logging.NOTSET, '', 0, '', (), None))
+) | {'message', 'asctime'}
+
+
+def _format_timestamp(record: logging.LogRecord, converter: Callable = time.localtime) -> str:
+    """Format a record timestamp as ISO 8601 without building a datetime.
+    
+    Seconds and milliseconds come from the same converter and record.msecs
+    that logging.Formatter.formatTime uses, so the JSON timestamp matches
+    the text handlers for the same record.
+    """
+    seconds = time.strftime('%Y-%m-%dT%H:%M:%S', converter(record.created))
+    return f"{seconds}.{int(record.msecs):03d}"
+
 
 class JSONFormatter(logging.Formatter):
     """Custom JSON formatter for structured logging."""
@@ -19,7 +42,7 @@ class JSONFormatter(logging.Formatter):
     def format(self, record: logging.LogRecord) -> str:
         """Format log record as JSON."""
         log_data = {
-            'timestamp': datetime.fromtimestamp(record.created).isoformat(),
+            'timestamp': _format_timestamp(record, self.converter),
             'level': record.levelname,
             'logger': record.name,
             'message': record.getMessage(),
@@ -37,10 +60,13 @@ class JSONFormatter(logging.Formatter):
             }
             
         # Add extra fields
-        if hasattr(record, 'extra_data'):
-            log_data.update(record.extra_data)
+        log_data.update({
+            key: value for key, value in record.__dict__.items()
+            if key not in _RESERVED_RECORD_ATTRS
+        })
             
-        return json.dumps(log_data, ensure_ascii=False)
+        # orjson emits UTF-8 directly without ASCII-escaping
+        return orjson.dumps(log_data, option=orjson.OPT_NON_STR_KEYS, default=str).decode()
 
 
 class ColoredFormatter(logging.Formatter):
@@ -56,16 +82,201 @@ class ColoredFormatter(logging.Formatter):
         'RESET': '\033[0m'      # Reset
     }
     
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        reset = self.COLORS['RESET']
+        self._default_colors = (reset, reset)
+        self._colors = {
+            level: (code, reset)
+            for level, code in self.COLORS.items() if level != 'RESET'
+        }
+        
     def format(self, record: logging.LogRecord) -> str:
         """Format with colors for console output."""
-        color = self.COLORS.get(record.levelname, self.COLORS['RESET'])
-        reset = self.COLORS['RESET']
+        prefix, suffix = self._colors.get(record.levelname, self._default_colors)
+        return prefix + super().format(record) + suffix
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that drops the oldest record instead of blocking when full."""
+    
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped_records = 0
         
-        # Format the message
-        formatted = super().format(record)
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Merge message args but keep exc_info for the downstream JSON formatter."""
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
         
-        # Add color
-        return f"{color}{formatted}{reset}"
+    def enqueue(self, record: logging.LogRecord):
+        """Enqueue without blocking, evicting the oldest record under back-pressure."""
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            try:
+                self.queue.get_nowait()
+                self.queue.task_done()
+            except queue.Empty:
+                pass
+            self.dropped_records += 1
+            try:
+                self.queue.put_nowait(record)
+            except queue.Full:
+                self.dropped_records += 1
+
+
+class BatchingFileHandler(logging.handlers.MemoryHandler):
+    """
+    Buffer records and write them to a rotating file handler in one batch.
+    
+    The buffer is flushed when it reaches capacity, when an ERROR record
+    arrives, or at least every flush_interval seconds.
+    """
+    
+    def __init__(
+        self,
+        target: logging.handlers.RotatingFileHandler,
+        capacity: int = 256,
+        flush_interval: float = 0.2
+    ):
+        super().__init__(
+            capacity,
+            flushLevel=logging.ERROR,
+            target=target,
+            flushOnClose=True
+        )
+        self.flush_interval = flush_interval
+        self._stop = threading.Event()
+        self._flusher = threading.Thread(
+            target=self._flush_loop, name='BatchingFileHandler-flush', daemon=True
+        )
+        self._flusher.start()
+        
+    def _flush_loop(self):
+        """Flush pending records periodically so low-volume logs still appear promptly."""
+        while not self._stop.wait(self.flush_interval):
+            # logging.shutdown() holds the handler lock while calling close(),
+            # so never block on it indefinitely
+            if not self.lock.acquire(timeout=self.flush_interval):
+                continue
+            try:
+                if not self._stop.is_set():
+                    self.flush()
+            finally:
+                self.lock.release()
+            
+    def flush(self):
+        """Format all buffered records and write them with a single call."""
+        self.acquire()
+        try:
+            target = self.target
+            if not target or not self.buffer:
+                return
+                
+            records = self.buffer
+            self.buffer = []
+            try:
+                payload = ''.join(
+                    target.format(record) + target.terminator for record in records
+                )
+                target.acquire()
+                try:
+                    if target.stream is None:
+                        target.stream = target._open()
+                    if target.maxBytes > 0:
+                        # Compare encoded bytes, not characters, against the limit
+                        size = len(payload.encode(target.encoding or 'utf-8',
+                                                  target.errors or 'strict'))
+                        target.stream.seek(0, 2)
+                        if target.stream.tell() + size >= target.maxBytes:
+                            target.doRollover()
+                    target.stream.write(payload)
+                    target.stream.flush()
+                finally:
+                    target.release()
+            except Exception:
+                target.handleError(records[-1])
+        finally:
+            self.release()
+            
+    def close(self):
+        """Stop the flush thread, flush and close the target."""
+        self._stop.set()
+        if self._flusher is not threading.current_thread():
+            # Bounded: the caller may hold the handler lock the flusher waits on
+            self._flusher.join(timeout=2 * self.flush_interval)
+        target = self.target
+        super().close()
+        if target:
+            target.close()
+
+
+# Hot-path DEBUG events (page/cache) are rate limited and de-duplicated
+_DEFAULT_DEBUG_SAMPLE_RATE = 1000  # max sampled DEBUG events per second
+_DEBUG_DUPLICATE_WINDOW = 5.0  # seconds
+_DEBUG_DUPLICATE_CACHE_SIZE = 1024
+
+# Shared queue handlers keyed by log file, each drained by one background listener
+_LOG_QUEUE_SIZE = 10000
+_queue_handlers: Dict[str, DroppingQueueHandler] = {}
+
+
+def _get_file_queue_handler(log_file: str) -> DroppingQueueHandler:
+    """
+    Get the queue handler fronting the file handlers for a log file.
+    
+    The rotating text and JSON file handlers are driven by a QueueListener
+    thread through batching buffers, so that callers only pay for a
+    non-blocking queue put and the files see few, large writes.
+    
+    Args:
+        log_file: Path of the text log file
+        
+    Returns:
+        DroppingQueueHandler instance
+    """
+    handler = _queue_handlers.get(log_file)
+    if handler is not None:
+        return handler
+        
+    log_path = Path(log_file)
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    
+    file_handler = logging.handlers.RotatingFileHandler(
+        log_file,
+        maxBytes=10 * 1024 * 1024,  # 10MB
+        backupCount=5
+    )
+    file_formatter = logging.Formatter(
+        '%(asctime)s | %(levelname)8s | %(name)s:%(funcName)s:%(lineno)d | %(message)s'
+    )
+    file_handler.setFormatter(file_formatter)
+    
+    # JSON file handler for structured logs
+    json_file = log_file.replace('.log', '_structured.json')
+    json_handler = logging.handlers.RotatingFileHandler(
+        json_file,
+        maxBytes=10 * 1024 * 1024,  # 10MB
+        backupCount=5
+    )
+    json_handler.setFormatter(JSONFormatter())
+    
+    log_queue = queue.Queue(maxsize=_LOG_QUEUE_SIZE)
+    listener = logging.handlers.QueueListener(
+        log_queue,
+        BatchingFileHandler(file_handler),
+        BatchingFileHandler(json_handler),
+        respect_handler_level=True
+    )
+    listener.start()
+    atexit.register(listener.stop)
+    
+    handler = DroppingQueueHandler(log_queue)
+    _queue_handlers[log_file] = handler
+    return handler
 
 
 class AnalysisLogger:
@@ -92,6 +303,14 @@ class AnalysisLogger:
         level = self.config.get('level', 'INFO').upper()
         self.logger.setLevel(getattr(logging, level))
         
+        # Sampling state for hot-path DEBUG events
+        self._debug_sample_rate = int(
+            self.config.get('debug_sample_rate', _DEFAULT_DEBUG_SAMPLE_RATE)
+        )
+        self._debug_tokens = self._debug_sample_rate
+        self._debug_refilled_at = time.monotonic()
+        self._recent_debug: OrderedDict[Tuple[str, str], float] = OrderedDict()
+        
         # Console handler with colors
         console_handler = logging.StreamHandler(sys.stdout)
         console_formatter = ColoredFormatter(
@@ -101,140 +320,173 @@ class AnalysisLogger:
         console_handler.setFormatter(console_formatter)
         self.logger.addHandler(console_handler)
         
-        # File handler
+        # File handlers run on a background listener thread
         log_file = self.config.get('file_path', 'logs/analyzer.log')
-        log_path = Path(log_file)
-        log_path.parent.mkdir(parents=True, exist_ok=True)
+        self.logger.addHandler(_get_file_queue_handler(log_file))
         
-        file_handler = logging.handlers.RotatingFileHandler(
-            log_file,
-            maxBytes=10 * 1024 * 1024,  # 10MB
-            backupCount=5
-        )
-        file_formatter = logging.Formatter(
-            '%(asctime)s | %(levelname)8s | %(name)s:%(funcName)s:%(lineno)d | %(message)s'
-        )
-        file_handler.setFormatter(file_formatter)
-        self.logger.addHandler(file_handler)
+    def _should_sample_debug(self, event: str, key: str) -> bool:
+        """
+        Decide whether a hot-path DEBUG event should be emitted.
         
-        # JSON file handler for structured logs
-        json_file = log_file.replace('.log', '_structured.json')
-        json_handler = logging.handlers.RotatingFileHandler(
-            json_file,
-            maxBytes=10 * 1024 * 1024,  # 10MB
-            backupCount=5
-        )
-        json_handler.setFormatter(JSONFormatter())
-        self.logger.addHandler(json_handler)
+        Repeats of the same (event, key) within the duplicate window are
+        suppressed, and at most debug_sample_rate events pass per second.
+        
+        Args:
+            event: Event name
+            key: Event subject used for duplicate suppression
+            
+        Returns:
+            True if the event should be logged
+        """
+        now = time.monotonic()
+        dedup_key = (event, key)
+        last_emitted = self._recent_debug.get(dedup_key)
+        if last_emitted is not None and now - last_emitted < _DEBUG_DUPLICATE_WINDOW:
+            return False
+            
+        if now - self._debug_refilled_at >= 1.0:
+            self._debug_tokens = self._debug_sample_rate
+            self._debug_refilled_at = now
+        if self._debug_tokens <= 0:
+            return False
+        self._debug_tokens -= 1
+        
+        self._recent_debug[dedup_key] = now
+        self._recent_debug.move_to_end(dedup_key)
+        if len(self._recent_debug) > _DEBUG_DUPLICATE_CACHE_SIZE:
+            self._recent_debug.popitem(last=False)
+        return True
         
     def analysis_start(self, url: str, analysis_id: str):
         """Log analysis start."""
         self.logger.info(
-            f"Starting analysis for {url}",
-            extra={'extra_data': {
+            "Starting analysis for %s", url,
+            extra={
                 'event': 'analysis_start',
                 'url': url,
                 'analysis_id': analysis_id
-            }}
+            }
         )
         
     def analysis_complete(self, url: str, analysis_id: str, duration: float, pages_count: int):
         """Log analysis completion."""
         self.logger.info(
-            f"Analysis completed for {url} in {duration:.2f}s ({pages_count} pages)",
-            extra={'extra_data': {
+            "Analysis completed for %s in %.2fs (%d pages)", url, duration, pages_count,
+            extra={
                 'event': 'analysis_complete',
                 'url': url,
                 'analysis_id': analysis_id,
                 'duration': duration,
                 'pages_count': pages_count
-            }}
+            }
         )
         
     def page_processed(self, url: str, page_url: str, processing_time: float):
         """Log page processing."""
+        if not self.logger.isEnabledFor(logging.DEBUG):
+            return
+        if not self._should_sample_debug('page_processed', page_url):
+            return
+            
         self.logger.debug(
-            f"Processed page {page_url} in {processing_time:.2f}s",
-            extra={'extra_data': {
+            "Processed page %s in %.2fs", page_url, processing_time,
+            extra={
                 'event': 'page_processed',
                 'website_url': url,
                 'page_url': page_url,
                 'processing_time': processing_time
-            }}
+            }
         )
         
     def api_request(self, service: str, model: str, tokens_used: Optional[int] = None):
         """Log API requests."""
+        if not self.logger.isEnabledFor(logging.DEBUG):
+            return
+            
         message = f"API request to {service} ({model})"
         if tokens_used:
             message += f" - {tokens_used} tokens"
             
         self.logger.debug(
             message,
-            extra={'extra_data': {
+            extra={
                 'event': 'api_request',
                 'service': service,
                 'model': model,
                 'tokens_used': tokens_used
-            }}
+            }
         )
         
     def error_occurred(self, error: Exception, context: Dict[str, Any]):
         """Log errors with context."""
         self.logger.error(
-            f"Error occurred: {str(error)}",
+            "Error occurred: %s", error,
             exc_info=True,
-            extra={'extra_data': {
+            extra={
                 'event': 'error',
                 'error_type': type(error).__name__,
                 'context': context
-            }}
+            }
         )
         
     def performance_metric(self, metric_name: str, value: float, unit: str = 'seconds'):
         """Log performance metrics."""
         self.logger.info(
-            f"Performance metric: {metric_name} = {value:.3f} {unit}",
-            extra={'extra_data': {
+            "Performance metric: %s = %.3f %s", metric_name, value, unit,
+            extra={
                 'event': 'performance_metric',
                 'metric_name': metric_name,
                 'value': value,
                 'unit': unit
-            }}
+            }
         )
         
     def rate_limit_hit(self, service: str, retry_after: float):
         """Log rate limiting."""
         self.logger.warning(
-            f"Rate limit hit for {service}, retrying after {retry_after}s",
-            extra={'extra_data': {
+            "Rate limit hit for %s, retrying after %ss", service, retry_after,
+            extra={
                 'event': 'rate_limit',
                 'service': service,
                 'retry_after': retry_after
-            }}
+            }
         )
         
     def cache_hit(self, cache_key: str):
         """Log cache hits."""
+        if not self.logger.isEnabledFor(logging.DEBUG):
+            return
+        if not self._should_sample_debug('cache_hit', cache_key):
+            return
+            
         self.logger.debug(
-            f"Cache hit: {cache_key}",
-            extra={'extra_data': {
+            "Cache hit: %s", cache_key,
+            extra={
                 'event': 'cache_hit',
                 'cache_key': cache_key
-            }}
+            }
         )
         
     def cache_miss(self, cache_key: str):
         """Log cache misses."""
+        if not self.logger.isEnabledFor(logging.DEBUG):
+            return
+        if not self._should_sample_debug('cache_miss', cache_key):
+            return
+            
         self.logger.debug(
-            f"Cache miss: {cache_key}",
-            extra={'extra_data': {
+            "Cache miss: %s", cache_key,
+            extra={
                 'event': 'cache_miss',
                 'cache_key': cache_key
-            }}
+            }
         )
 
 
+# AnalysisLogger instances keyed by logger name
+_analysis_loggers: Dict[str, AnalysisLogger] = {}
+
+
 def get_logger(name: str, config: Optional[Dict[str, Any]] = None) -> AnalysisLogger:
     """
     Get an enhanced logger instance.
@@ -246,7 +498,12 @@ def get_logger(name: str, config: Optional[Dict[str, Any]] = None) -> AnalysisLo
     Returns:
         AnalysisLogger instance
     """
-    return AnalysisLogger(name, config)
+    # Reuse the existing instance unless a different config is requested
+    logger = _analysis_loggers.get(name)
+    if logger is None or (config is not None and config != logger.config):
+        logger = AnalysisLogger(name, config)
+        _analysis_loggers[name] = logger
+    return logger
 
 
 def setup_root_logger(config: Dict[str, Any]):
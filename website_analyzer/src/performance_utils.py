@@ -4,19 +4,42 @@ Includes caching, rate limiting, memory management, and monitoring.
 """
 
 import asyncio
+import heapq
+import math
+import os
+from array import array
 import time
-import hashlib
-import json
 import gc
+import inspect
 import psutil
-from typing import Dict, Any, Optional, List, Callable, Union
+import numpy as np
+import orjson
+import xxhash
+from typing import Dict, Any, Optional, List, Callable, Tuple, Union
+from collections import OrderedDict
 from functools import wraps
 from dataclasses import dataclass
 from datetime import datetime, timedelta
-import aioredis
+from redis import asyncio as redis_asyncio
 from pathlib import Path
 import pickle
 
+from .config_manager import config_manager
+
+
+# MemoryCache sweeps expired entries globally at most this often;
+# the accessed key itself is always checked on get
+_SWEEP_EVERY_ACCESSES = 1024
+_SWEEP_INTERVAL_SECONDS = 30
+
+# Linux exposes RSS in /proc/self/statm, far cheaper to read than psutil
+_PROC_STATM = '/proc/self/statm'
+_HAS_PROC_STATM = os.path.exists(_PROC_STATM)
+_PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if _HAS_PROC_STATM else 0
+
+# Operations shorter than this (seconds) reuse the start memory sample
+_MEMORY_SAMPLE_MIN_DURATION = 0.01
+
 
 @dataclass
 class PerformanceMetrics:
@@ -44,9 +67,14 @@ class MemoryCache:
             max_size: Maximum number of cached items
             default_ttl: Default time-to-live in seconds
         """
-        self._cache: Dict[str, Dict[str, Any]] = {}
+        # Insertion order doubles as LRU order (least recent first)
+        self._cache: OrderedDict[str, Dict[str, Any]] = OrderedDict()
+        # Min-heap of (expires_at, key); entries may be stale after overwrite/delete
+        self._expiry: List[Tuple[float, str]] = []
         self._max_size = max_size
         self._default_ttl = default_ttl
+        self._access_count = 0
+        self._last_sweep = time.time()
         
     def _is_expired(self, item: Dict[str, Any]) -> bool:
         """Check if cache item is expired."""
@@ -55,31 +83,34 @@ class MemoryCache:
     def _cleanup_expired(self):
         """Remove expired items from cache."""
         current_time = time.time()
-        expired_keys = [
-            key for key, item in self._cache.items()
-            if current_time > item['expires_at']
-        ]
-        for key in expired_keys:
-            del self._cache[key]
+        while self._expiry and self._expiry[0][0] < current_time:
+            expires_at, key = heapq.heappop(self._expiry)
+            item = self._cache.get(key)
+            if item is not None and item['expires_at'] == expires_at:
+                del self._cache[key]
+                
+    def _maybe_cleanup_expired(self):
+        """Run the global expiry sweep once per N accesses or T seconds."""
+        self._access_count += 1
+        now = time.time()
+        if (self._access_count % _SWEEP_EVERY_ACCESSES == 0
+                or now - self._last_sweep > _SWEEP_INTERVAL_SECONDS):
+            self._cleanup_expired()
+            self._last_sweep = now
             
     def _evict_lru(self):
         """Evict least recently used items if cache is full."""
-        if len(self._cache) >= self._max_size:
-            # Sort by last accessed time
-            lru_key = min(
-                self._cache.keys(),
-                key=lambda k: self._cache[k]['last_accessed']
-            )
-            del self._cache[lru_key]
+        while len(self._cache) >= self._max_size:
+            self._cache.popitem(last=False)
             
     def get(self, key: str) -> Optional[Any]:
         """Get item from cache."""
-        self._cleanup_expired()
+        self._maybe_cleanup_expired()
         
         if key in self._cache:
             item = self._cache[key]
             if not self._is_expired(item):
-                item['last_accessed'] = time.time()
+                self._cache.move_to_end(key)
                 return item['value']
             else:
                 del self._cache[key]
@@ -88,15 +119,23 @@ class MemoryCache:
         
     def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
         """Set item in cache."""
-        self._cleanup_expired()
+        self._maybe_cleanup_expired()
+        if key in self._cache:
+            del self._cache[key]
         self._evict_lru()
         
         ttl = ttl or self._default_ttl
+        expires_at = time.time() + ttl
         self._cache[key] = {
             'value': value,
-            'expires_at': time.time() + ttl,
-            'last_accessed': time.time()
+            'expires_at': expires_at
         }
+        heapq.heappush(self._expiry, (expires_at, key))
+        
+        # Rebuild the heap when stale entries from evictions pile up
+        if len(self._expiry) > 2 * self._max_size:
+            self._expiry = [(item['expires_at'], k) for k, item in self._cache.items()]
+            heapq.heapify(self._expiry)
         
     def delete(self, key: str) -> bool:
         """Delete item from cache."""
@@ -108,6 +147,7 @@ class MemoryCache:
     def clear(self) -> None:
         """Clear all cache items."""
         self._cache.clear()
+        self._expiry.clear()
         
     def stats(self) -> Dict[str, Any]:
         """Get cache statistics."""
@@ -122,22 +162,76 @@ class MemoryCache:
 class RedisCache:
     """Redis-based cache with async support."""
     
-    def __init__(self, redis_url: str = "redis://localhost:6379", prefix: str = "wa:"):
+    # One-byte tag prefixed to every stored payload
+    _TAG_ORJSON = b'\x00'
+    _TAG_PICKLE = b'\x01'
+    
+    def __init__(
+        self,
+        redis_url: str = "redis://localhost:6379",
+        prefix: str = "wa:",
+        serializer: str = "orjson"
+    ):
         """
         Initialize Redis cache.
         
         Args:
             redis_url: Redis connection URL
             prefix: Key prefix for namespacing
+            serializer: "orjson" (JSON-native values only, pickle otherwise) or "pickle"
         """
         self._redis_url = redis_url
         self._prefix = prefix
-        self._redis: Optional[aioredis.Redis] = None
+        self._serializer = serializer
+        self._redis: Optional[redis_asyncio.Redis] = None
+        self._pool: Optional[redis_asyncio.ConnectionPool] = None
+        
+    @classmethod
+    def _is_json_native(cls, value: Any) -> bool:
+        """Check whether a value survives a JSON round trip unchanged.
+        
+        Only exact dict/list/str/int/float/bool/None qualify; tuples,
+        subclasses, dataclasses, datetimes and non-finite floats would come
+        back as a different type or value, so they must use pickle.
+        """
+        value_type = type(value)
+        if value is None or value_type in (str, int, bool):
+            return True
+        if value_type is float:
+            return math.isfinite(value)
+        if value_type is list:
+            return all(cls._is_json_native(item) for item in value)
+        if value_type is dict:
+            return all(
+                type(key) is str and cls._is_json_native(item)
+                for key, item in value.items()
+            )
+        return False
+        
+    def _dumps(self, value: Any) -> bytes:
+        """Serialize a value, using orjson only for JSON-native data."""
+        if self._serializer == "orjson" and self._is_json_native(value):
+            try:
+                return self._TAG_ORJSON + orjson.dumps(value)
+            except TypeError:
+                # e.g. integers beyond 64 bits
+                pass
+        return self._TAG_PICKLE + pickle.dumps(value)
+        
+    def _loads(self, data: bytes) -> Any:
+        """Deserialize a tagged payload."""
+        tag, payload = data[:1], data[1:]
+        if tag == self._TAG_ORJSON:
+            return orjson.loads(payload)
+        return pickle.loads(payload)
         
     async def connect(self):
         """Connect to Redis."""
         try:
-            self._redis = await aioredis.from_url(self._redis_url)
+            self._pool = redis_asyncio.ConnectionPool.from_url(
+                self._redis_url, max_connections=32
+            )
+            self._redis = redis_asyncio.Redis(connection_pool=self._pool)
             await self._redis.ping()
         except Exception:
             self._redis = None
@@ -150,7 +244,7 @@ class RedisCache:
         try:
             data = await self._redis.get(f"{self._prefix}{key}")
             if data:
-                return pickle.loads(data)
+                return self._loads(data)
         except Exception:
             pass
             
@@ -162,7 +256,7 @@ class RedisCache:
             return False
             
         try:
-            data = pickle.dumps(value)
+            data = self._dumps(value)
             await self._redis.setex(f"{self._prefix}{key}", ttl, data)
             return True
         except Exception:
@@ -178,6 +272,34 @@ class RedisCache:
             return result > 0
         except Exception:
             return False
+            
+    async def mget(self, keys: List[str]) -> List[Optional[Any]]:
+        """Get several items in one pipelined round-trip."""
+        if not self._redis or not keys:
+            return [None] * len(keys)
+            
+        try:
+            async with self._redis.pipeline(transaction=False) as pipe:
+                for key in keys:
+                    pipe.get(f"{self._prefix}{key}")
+                results = await pipe.execute()
+            return [self._loads(data) if data else None for data in results]
+        except Exception:
+            return [None] * len(keys)
+            
+    async def mset(self, items: Dict[str, Any], ttl: int = 3600) -> bool:
+        """Set several items in one pipelined round-trip."""
+        if not self._redis:
+            return False
+            
+        try:
+            async with self._redis.pipeline(transaction=False) as pipe:
+                for key, value in items.items():
+                    pipe.setex(f"{self._prefix}{key}", ttl, self._dumps(value))
+                await pipe.execute()
+            return True
+        except Exception:
+            return False
 
 
 class RateLimiter:
@@ -198,6 +320,7 @@ class RateLimiter:
         self._tokens = max_tokens
         self._last_refill = time.time()
         self._lock = asyncio.Lock()
+        self._waiter_lock = asyncio.Lock()
         
     async def acquire(self, tokens: int = 1) -> bool:
         """
@@ -218,9 +341,25 @@ class RateLimiter:
             return False
             
     async def wait_for_token(self, tokens: int = 1) -> None:
-        """Wait until tokens are available."""
-        while not await self.acquire(tokens):
-            await asyncio.sleep(0.1)
+        """Wait until tokens are available, serving waiters in FIFO order."""
+        async with self._waiter_lock:
+            while True:
+                async with self._lock:
+                    self._refill_tokens()
+                    if self._tokens >= tokens:
+                        self._tokens -= tokens
+                        return
+                    wait_time = self._time_until_available(tokens)
+                    
+                # Sleep exactly until the refill that covers the deficit
+                await asyncio.sleep(wait_time)
+                    
+    def _time_until_available(self, tokens: int) -> float:
+        """Seconds until enough tokens will have been refilled."""
+        deficit = tokens - self._tokens
+        refills_needed = -(-deficit // self._refill_amount)
+        elapsed = time.time() - self._last_refill
+        return max(refills_needed * self._refill_period - elapsed, 0.0)
             
     def _refill_tokens(self):
         """Refill tokens based on elapsed time."""
@@ -236,12 +375,32 @@ class RateLimiter:
 class PerformanceMonitor:
     """Performance monitoring and optimization utilities."""
     
-    def __init__(self):
-        """Initialize performance monitor."""
-        self._metrics: Dict[str, PerformanceMetrics] = {}
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        """
+        Initialize performance monitor.
+        
+        Args:
+            config: Monitor configuration; `enabled` turns on timed_operation
+        """
+        config = config or {}
+        self._enabled = config.get('enabled', False)
+        self._next_op_id = 0
+        # In-flight operations; completed ones are folded into the
+        # column arrays below so reports can aggregate them in one pass
+        self._active: Dict[Union[str, int], PerformanceMetrics] = {}
+        self._total_operations = 0
+        self._op_ids: List[Union[str, int]] = []
+        self._start_times = array('d')
+        self._durations = array('d')
+        self._memory_after = array('d')
         self._memory_cache = MemoryCache()
         self._redis_cache: Optional[RedisCache] = None
         self._rate_limiters: Dict[str, RateLimiter] = {}
+        self._process = psutil.Process()
+        self._memory_sample = 0.0
+        self._memory_sampled_at = 0.0
+        self._current_cpu: Optional[float] = None
+        self._cpu_sampler: Optional[asyncio.Task] = None
         
     async def setup_redis_cache(self, redis_url: str):
         """Setup Redis cache."""
@@ -260,26 +419,34 @@ class PerformanceMonitor:
         
     async def cached_call(
         self,
-        cache_key: str,
+        cache_key: Optional[str],
         func: Callable,
         *args,
         ttl: int = 3600,
         use_redis: bool = False,
+        key_builder: Optional[Callable[..., str]] = None,
         **kwargs
     ) -> Any:
         """
         Execute function with caching.
         
         Args:
-            cache_key: Unique cache key
+            cache_key: Unique cache key, or None to derive it from the arguments
             func: Function to execute
             ttl: Cache TTL in seconds
             use_redis: Use Redis cache if available
+            key_builder: Prebuilt key builder from make_key_builder(func)
             *args, **kwargs: Function arguments
             
         Returns:
             Function result (cached or fresh)
         """
+        if cache_key is None:
+            if key_builder is not None:
+                cache_key = key_builder(*args, **kwargs)
+            else:
+                cache_key = cache_key_from_args(*args, **kwargs)
+                
         # Try cache first
         cache = self._redis_cache if use_redis and self._redis_cache else self._memory_cache
         
@@ -305,38 +472,88 @@ class PerformanceMonitor:
             
         return result
         
-    def start_monitoring(self, operation_id: str) -> PerformanceMetrics:
+    @property
+    def enabled(self) -> bool:
+        """Whether timed_operation records metrics."""
+        return self._enabled
+        
+    def next_operation_id(self) -> int:
+        """Allocate a unique operation id."""
+        self._next_op_id += 1
+        return self._next_op_id
+        
+    def start_monitoring(self, operation_id: Union[str, int]) -> PerformanceMetrics:
         """Start monitoring an operation."""
+        self._ensure_cpu_sampler()
         metrics = PerformanceMetrics(
             start_time=time.time(),
             memory_before=self._get_memory_usage(),
-            cpu_percent=psutil.cpu_percent()
+            cpu_percent=self._current_cpu
         )
-        self._metrics[operation_id] = metrics
+        self._active[operation_id] = metrics
+        self._total_operations += 1
         return metrics
         
-    def stop_monitoring(self, operation_id: str) -> Optional[PerformanceMetrics]:
+    def stop_monitoring(self, operation_id: Union[str, int]) -> Optional[PerformanceMetrics]:
         """Stop monitoring an operation."""
-        if operation_id not in self._metrics:
+        metrics = self._active.pop(operation_id, None)
+        if metrics is None:
             return None
             
-        metrics = self._metrics[operation_id]
         metrics.end_time = time.time()
         metrics.duration = metrics.end_time - metrics.start_time
-        metrics.memory_after = self._get_memory_usage()
-        metrics.memory_peak = self._get_peak_memory()
+        
+        # Cheap operations don't need a before/after memory delta
+        if metrics.duration < _MEMORY_SAMPLE_MIN_DURATION:
+            metrics.memory_after = metrics.memory_before
+        else:
+            metrics.memory_after = self._get_memory_usage()
+            metrics.memory_peak = self._get_peak_memory()
+            
+        self._op_ids.append(operation_id)
+        self._start_times.append(metrics.start_time)
+        self._durations.append(metrics.duration)
+        self._memory_after.append(metrics.memory_after)
         
         return metrics
         
+    def _ensure_cpu_sampler(self):
+        """Start the background CPU sampler if an event loop is running."""
+        if self._cpu_sampler is not None and not self._cpu_sampler.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._cpu_sampler = loop.create_task(self._sample_cpu())
+        
+    async def _sample_cpu(self):
+        """Sample system CPU usage once per second."""
+        psutil.cpu_percent(interval=None)
+        while True:
+            await asyncio.sleep(1.0)
+            self._current_cpu = psutil.cpu_percent(interval=None)
+            
     def _get_memory_usage(self) -> float:
         """Get current memory usage in MB."""
-        process = psutil.Process()
-        return process.memory_info().rss / 1024 / 1024
+        if _HAS_PROC_STATM:
+            with open(_PROC_STATM, 'rb') as f:
+                return int(f.read().split()[1]) * _PAGE_SIZE / 1024 / 1024
+                
+        # Elsewhere fall back to psutil, sampled at most once per second
+        now = time.time()
+        if now - self._memory_sampled_at >= 1.0:
+            self._memory_sample = self._process.memory_info().rss / 1024 / 1024
+            self._memory_sampled_at = now
+        return self._memory_sample
         
     def _get_peak_memory(self) -> float:
         """Get peak memory usage in MB."""
-        process = psutil.Process()
-        return process.memory_info().peak_wss / 1024 / 1024 if hasattr(process.memory_info(), 'peak_wss') else 0
+        # peak_wss is only reported on Windows
+        if _HAS_PROC_STATM:
+            return 0
+        memory_info = self._process.memory_info()
+        return getattr(memory_info, 'peak_wss', 0) / 1024 / 1024
         
     async def optimize_memory(self):
         """Perform memory optimization."""
@@ -363,19 +580,12 @@ class PerformanceMonitor:
         
     def generate_performance_report(self) -> Dict[str, Any]:
         """Generate performance report."""
-        total_operations = len(self._metrics)
-        completed_operations = sum(1 for m in self._metrics.values() if m.end_time is not None)
+        total_operations = self._total_operations
+        completed_operations = len(self._durations)
         
         if completed_operations > 0:
-            avg_duration = sum(
-                m.duration for m in self._metrics.values() 
-                if m.duration is not None
-            ) / completed_operations
-            
-            avg_memory = sum(
-                m.memory_after for m in self._metrics.values()
-                if m.memory_after is not None
-            ) / completed_operations
+            avg_duration = float(np.frombuffer(self._durations, dtype='f8').mean())
+            avg_memory = float(np.frombuffer(self._memory_after, dtype='f8').mean())
         else:
             avg_duration = 0
             avg_memory = 0
@@ -391,12 +601,24 @@ class PerformanceMonitor:
 
 
 def timed_operation(monitor: PerformanceMonitor):
-    """Decorator for timing operations."""
+    """
+    Decorator for timing operations.
+    
+    When the monitor is disabled at decoration time the function is
+    returned unwrapped, so production calls pay no monitoring cost. The
+    global performance_monitor reads `performance.enabled` (or the
+    PERFORMANCE_MONITORING environment variable) when this module is
+    imported; callers needing a different setting should decorate with
+    their own PerformanceMonitor({'enabled': True}).
+    """
     
     def decorator(func):
+        if not monitor.enabled:
+            return func
+            
         @wraps(func)
         async def async_wrapper(*args, **kwargs):
-            operation_id = f"{func.__name__}_{int(time.time() * 1000)}"
+            operation_id = monitor.next_operation_id()
             monitor.start_monitoring(operation_id)
             
             try:
@@ -407,7 +629,7 @@ def timed_operation(monitor: PerformanceMonitor):
                 
         @wraps(func)
         def sync_wrapper(*args, **kwargs):
-            operation_id = f"{func.__name__}_{int(time.time() * 1000)}"
+            operation_id = monitor.next_operation_id()
             monitor.start_monitoring(operation_id)
             
             try:
@@ -445,13 +667,74 @@ def rate_limited(limiter_name: str, tokens: int = 1):
 
 def cache_key_from_args(*args, **kwargs) -> str:
     """Generate cache key from function arguments."""
-    key_data = {
-        'args': [str(arg) for arg in args],
-        'kwargs': {k: str(v) for k, v in kwargs.items()}
-    }
-    key_string = json.dumps(key_data, sort_keys=True)
-    return hashlib.md5(key_string.encode()).hexdigest()
+    key_data = {'args': args, 'kwargs': kwargs}
+    # Non-cryptographic hash is enough for a cache key; repr() covers
+    # arguments orjson cannot serialize natively
+    try:
+        key_bytes = orjson.dumps(
+            key_data,
+            option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS,
+            default=repr
+        )
+    except TypeError:
+        # e.g. integers beyond 64 bits or unsortable mixed-type keys
+        key_bytes = repr((args, sorted(kwargs.items()))).encode()
+    return xxhash.xxh3_64(key_bytes).hexdigest()
+
+
+class _SourceName:
+    """Placeholder whose repr is a bare name, used when rendering signatures."""
+    
+    def __init__(self, name: str):
+        self._name = name
+        
+    def __repr__(self) -> str:
+        return self._name
+
+
+def make_key_builder(func: Callable) -> Callable[..., str]:
+    """
+    Build a cache key function specialized to func's signature.
+    
+    The signature is inspected once and a builder with the same parameters
+    is generated, so each call only formats the argument reprs and hashes
+    them, without building or sorting an intermediate dict.
+    
+    Args:
+        func: Function whose calls will be cached
+        
+    Returns:
+        Callable accepting the same arguments as func and returning a key
+    """
+    signature = inspect.signature(func)
+    namespace: Dict[str, Any] = {'__key_hash': xxhash.xxh3_64}
+    params: List[inspect.Parameter] = []
+    parts: List[str] = []
+    
+    for name, param in signature.parameters.items():
+        # Defaults are referenced by name from the exec namespace
+        if param.default is not param.empty:
+            default_name = f"__default_{name}"
+            namespace[default_name] = param.default
+            param = param.replace(default=_SourceName(default_name))
+        params.append(param.replace(annotation=param.empty))
+        
+        if param.kind is param.VAR_KEYWORD:
+            parts.append(f"{{sorted({name}.items())!r}}")
+        else:
+            parts.append(f"{{{name}!r}}")
+            
+    arglist = signature.replace(
+        parameters=params, return_annotation=signature.empty
+    )
+    source = (
+        f"def _key_builder{arglist}:\n"
+        f"    return __key_hash(f\"{'|'.join(parts)}\".encode()).hexdigest()\n"
+    )
+    exec(source, namespace)
+    return namespace['_key_builder']
 
 
-# Global performance monitor instance
-performance_monitor = PerformanceMonitor()
+# Global performance monitor instance, configured before any decoration
+# since timed_operation checks `enabled` only once per function
+performance_monitor = PerformanceMonitor(config_manager.get_config('performance', {}))
@@ -3,49 +3,325 @@
 整合分析結果，生成可視化報告，支援 HTML 和 PDF 格式
 """
 
+import hashlib
+import heapq
+import importlib
+import importlib.util
 import json
 import time
+from collections import defaultdict
 from datetime import datetime
 from pathlib import Path
 from typing import List, Dict, Any, Optional
-from dataclasses import asdict
-import base64
+from dataclasses import fields, is_dataclass
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-# 報告生成依賴
-from jinja2 import Environment, FileSystemLoader, Template
-try:
-    import weasyprint
-    from weasyprint import HTML, CSS
-    WEASYPRINT_AVAILABLE = True
-except ImportError:
-    WEASYPRINT_AVAILABLE = False
-    print("警告: weasyprint 未安裝，PDF 生成功能不可用")
+import numpy as np
+from PIL import Image
 
+# SIMD 加速的 base64 (可選)，未安裝時使用標準庫
 try:
-    import matplotlib.pyplot as plt
-    import matplotlib
-    matplotlib.use('Agg')  # 非互動模式
-    MATPLOTLIB_AVAILABLE = True
+    from pybase64 import b64encode
 except ImportError:
-    MATPLOTLIB_AVAILABLE = False
-    print("警告: matplotlib 未安裝，圖表生成功能不可用")
+    from base64 import b64encode
 
+# 快速 JSON 序列化 (可選)，可直接序列化 dataclass
 try:
-    import plotly.graph_objects as go
-    import plotly.express as px
-    from plotly.offline import plot
-    PLOTLY_AVAILABLE = True
+    import orjson
+    ORJSON_AVAILABLE = True
 except ImportError:
-    PLOTLY_AVAILABLE = False
+    ORJSON_AVAILABLE = False
+
+# 報告生成依賴
+from jinja2 import Environment, FileSystemLoader, FileSystemBytecodeCache, Template
+
+# weasyprint (cairo/pango) 與 plotly 匯入成本高，模組載入時只檢查是否安裝，首次使用時才匯入
+WEASYPRINT_AVAILABLE = importlib.util.find_spec('weasyprint') is not None
+if not WEASYPRINT_AVAILABLE:
+    print("警告: weasyprint 未安裝，PDF 生成功能不可用")
+
+PLOTLY_AVAILABLE = importlib.util.find_spec('plotly') is not None
+if not PLOTLY_AVAILABLE:
     print("警告: plotly 未安裝，互動圖表功能不可用")
 
 from loguru import logger
 
 from .config_manager import config_manager
-from .gpt_analyzer import AnalysisResult
+from .gpt_analyzer import AnalysisResult, GPTAnalyzer
 from .browser_automation import ScreenshotInfo, PageMetrics, InteractionResult
 
 
+_LAZY_MODULES: Dict[str, Any] = {}
+
+
+def _lazy_import(module_name: str):
+    """首次使用時匯入模組並快取"""
+    module = _LAZY_MODULES.get(module_name)
+    if module is None:
+        module = _LAZY_MODULES[module_name] = importlib.import_module(module_name)
+    return module
+
+
+def _import_weasyprint():
+    """延遲匯入 weasyprint"""
+    return _lazy_import('weasyprint')
+
+
+def _import_plotly():
+    """延遲匯入 plotly.graph_objects"""
+    return _lazy_import('plotly.graph_objects')
+
+
+# 報告畫面樣式，寫入 assets/report.css 以 <link media="screen"> 載入
+REPORT_CSS = '''\
+body {
+    font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
+    line-height: 1.6;
+    margin: 0;
+    padding: 20px;
+    background-color: #f5f5f5;
+}
+.container {
+    max-width: 1200px;
+    margin: 0 auto;
+    background: white;
+    border-radius: 10px;
+    box-shadow: 0 0 20px rgba(0,0,0,0.1);
+    overflow: hidden;
+}
+.header {
+    background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+    color: white;
+    padding: 40px;
+    text-align: center;
+}
+.header h1 {
+    margin: 0;
+    font-size: 2.5em;
+    font-weight: 300;
+}
+.header .subtitle {
+    margin-top: 10px;
+    opacity: 0.9;
+    font-size: 1.1em;
+}
+.content {
+    padding: 40px;
+}
+.section {
+    margin-bottom: 40px;
+    padding: 30px;
+    background: #fafafa;
+    border-radius: 8px;
+    border-left: 4px solid #667eea;
+}
+.section h2 {
+    color: #333;
+    margin-top: 0;
+    font-size: 1.8em;
+    font-weight: 500;
+}
+.score-card {
+    display: inline-block;
+    padding: 20px;
+    margin: 10px;
+    background: white;
+    border-radius: 8px;
+    box-shadow: 0 2px 10px rgba(0,0,0,0.1);
+    text-align: center;
+    min-width: 150px;
+}
+.score-value {
+    font-size: 2.5em;
+    font-weight: bold;
+    margin: 10px 0;
+}
+.score-label {
+    color: #666;
+    font-size: 0.9em;
+    text-transform: uppercase;
+    letter-spacing: 1px;
+}
+.grade-a { color: #4CAF50; }
+.grade-b { color: #8BC34A; }
+.grade-c { color: #FFC107; }
+.grade-d { color: #FF9800; }
+.grade-f { color: #F44336; }
+.screenshot-grid {
+    display: grid;
+    grid-template-columns: repeat(auto-fit, minmax(300px, 1fr));
+    gap: 20px;
+    margin: 20px 0;
+}
+.screenshot-item {
+    background: white;
+    border-radius: 8px;
+    overflow: hidden;
+    box-shadow: 0 2px 10px rgba(0,0,0,0.1);
+}
+.screenshot-item img {
+    width: 100%;
+    height: auto;
+    display: block;
+}
+.screenshot-info {
+    padding: 15px;
+}
+.device-label {
+    display: inline-block;
+    padding: 4px 8px;
+    background: #667eea;
+    color: white;
+    border-radius: 4px;
+    font-size: 0.8em;
+    margin-bottom: 10px;
+}
+.insights {
+    display: grid;
+    grid-template-columns: repeat(auto-fit, minmax(300px, 1fr));
+    gap: 20px;
+    margin: 20px 0;
+}
+.insight-box {
+    background: white;
+    padding: 20px;
+    border-radius: 8px;
+    box-shadow: 0 2px 10px rgba(0,0,0,0.1);
+}
+.insight-box h3 {
+    margin-top: 0;
+    color: #333;
+}
+.insight-list {
+    list-style: none;
+    padding: 0;
+}
+.insight-list li {
+    padding: 8px 0;
+    border-bottom: 1px solid #eee;
+}
+.insight-list li:last-child {
+    border-bottom: none;
+}
+.positive { color: #4CAF50; }
+.negative { color: #F44336; }
+.neutral { color: #2196F3; }
+.footer {
+    background: #333;
+    color: white;
+    text-align: center;
+    padding: 20px;
+    font-size: 0.9em;
+}
+'''
+
+# 列印/PDF 精簡樣式：移除陰影、漸層、media query，網格改為區塊排版
+# weasyprint 以 print 媒體類型排版，只會載入此樣式表
+REPORT_PRINT_CSS = '''\
+body { font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; line-height: 1.6; margin: 0; padding: 20px; }
+.header { background: #667eea; color: white; padding: 40px; text-align: center; }
+.header h1 { margin: 0; font-size: 2.5em; font-weight: 300; }
+.header .subtitle { margin-top: 10px; font-size: 1.1em; }
+.content { padding: 40px; }
+.section { margin-bottom: 40px; padding: 30px; background: #fafafa; border-left: 4px solid #667eea; }
+.section h2 { color: #333; margin-top: 0; font-size: 1.8em; font-weight: 500; }
+.score-card { display: inline-block; padding: 20px; margin: 10px; background: white; border: 1px solid #ddd; text-align: center; min-width: 150px; }
+.score-value { font-size: 2.5em; font-weight: bold; margin: 10px 0; }
+.score-label { color: #666; font-size: 0.9em; text-transform: uppercase; }
+.grade-a { color: #4CAF50; }
+.grade-b { color: #8BC34A; }
+.grade-c { color: #FFC107; }
+.grade-d { color: #FF9800; }
+.grade-f { color: #F44336; }
+.screenshot-grid, .insights { margin: 20px 0; }
+.screenshot-item, .insight-box { background: white; border: 1px solid #ddd; margin-bottom: 20px; padding: 15px; }
+.screenshot-item img { width: 100%; height: auto; display: block; }
+.device-label { display: inline-block; padding: 4px 8px; background: #667eea; color: white; font-size: 0.8em; margin-bottom: 10px; }
+.insight-box h3 { margin-top: 0; color: #333; }
+.insight-list { list-style: none; padding: 0; }
+.insight-list li { padding: 8px 0; border-bottom: 1px solid #eee; }
+.positive { color: #4CAF50; }
+.negative { color: #F44336; }
+.neutral { color: #2196F3; }
+.footer { background: #333; color: white; text-align: center; padding: 20px; font-size: 0.9em; }
+'''
+
+# base64 分塊大小需為 3 的倍數，各塊編碼結果才能直接串接
+_BASE64_CHUNK_SIZE = 57 * 1024
+
+# 評分等級門檻 (由低至高) 與對應的顏色類別、等級名稱
+_GRADE_THRESHOLDS = np.array([2.0, 4.0, 6.0, 8.0])
+_GRADE_COLORS = np.array(['grade-f', 'grade-d', 'grade-c', 'grade-b', 'grade-a'])
+_GRADE_LABELS = np.array(['需要重大改進', '待改進', '普通', '良好', '優秀'])
+
+# 截圖縮圖：報告中的截圖格約 300px 寬，以 2 倍寬度輸出 JPEG 即足夠清晰
+_THUMBNAIL_WIDTH = 600
+_THUMBNAIL_QUALITY = 85
+
+
+# 圖表 HTML 從 CDN 載入 plotly.js，避免每個檔案內嵌約 3MB 的腳本
+_CHART_HTML_OPTIONS = {
+    'include_plotlyjs': 'cdn',
+    'config': {'displaylogo': False}
+}
+
+# 趨勢圖最多顯示的頁面數
+_TREND_MAX_POINTS = 500
+
+
+def _group_means(keys: List[str], values: np.ndarray):
+    """依鍵分組計算平均值，回傳依首次出現順序排列的 (鍵陣列, 平均值陣列)"""
+    unique_keys, first_index, inverse = np.unique(
+        np.asarray(keys, dtype=object), return_index=True, return_inverse=True
+    )
+    sums = np.bincount(inverse, weights=values, minlength=len(unique_keys))
+    counts = np.bincount(inverse, minlength=len(unique_keys))
+    order = np.argsort(first_index, kind='stable')
+    return unique_keys[order], (sums / counts)[order]
+
+
+def _lttb_indices(values: np.ndarray, n_out: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets 降採樣，回傳保留點的索引"""
+    n = len(values)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    
+    # 首尾固定保留，中間 n_out - 2 個桶各選出一點
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    indices = np.empty(n_out, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = n - 1
+    
+    selected = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        
+        # 下一個桶的平均點
+        avg_x = (end + next_end - 1) / 2
+        avg_y = values[end:next_end].mean()
+        
+        # 選出與前一選點、下一桶平均點構成最大三角形面積的點
+        bucket_x = np.arange(start, end)
+        areas = np.abs(
+            (selected - avg_x) * (values[start:end] - values[selected])
+            - (selected - bucket_x) * (avg_y - values[selected])
+        )
+        selected = start + int(areas.argmax())
+        indices[i + 1] = selected
+    
+    return indices
+
+
+class _DataclassJSONEncoder(json.JSONEncoder):
+    """orjson 不可用時的備援編碼器，逐欄位序列化 dataclass 而不做 asdict 深層複製"""
+    
+    def default(self, obj):
+        if is_dataclass(obj) and not isinstance(obj, type):
+            return {f.name: getattr(obj, f.name) for f in fields(obj)}
+        return str(obj)
+
+
 class ReportGenerator:
     """報告生成器"""
     
@@ -56,6 +332,7 @@ class ReportGenerator:
         
         # 建立模板環境
         self.template_env = self._setup_template_environment()
+        self._report_template: Optional[Template] = None
         
         # 圖表輸出目錄
         self.charts_dir = self.output_dir / "charts"
@@ -64,6 +341,14 @@ class ReportGenerator:
         # 靜態資源目錄
         self.assets_dir = self.output_dir / "assets"
         self.assets_dir.mkdir(exist_ok=True)
+        self._write_stylesheets()
+    
+    def _write_stylesheets(self):
+        """將報告樣式表寫入 assets 目錄 (內容未變時不重寫)"""
+        for filename, css in (('report.css', REPORT_CSS), ('report_print.css', REPORT_PRINT_CSS)):
+            css_path = self.assets_dir / filename
+            if not css_path.exists() or css_path.read_text(encoding='utf-8') != css:
+                css_path.write_text(css, encoding='utf-8')
     
     def _setup_template_environment(self) -> Environment:
         """設置模板環境"""
@@ -75,9 +360,17 @@ class ReportGenerator:
             template_dir.mkdir(exist_ok=True)
             self._create_default_templates(template_dir)
         
+        # 編譯後的模板 bytecode 快取於輸出目錄，跨次執行重複使用
+        cache_dir = self.output_dir / ".jinja_cache"
+        cache_dir.mkdir(exist_ok=True)
+        
         env = Environment(
             loader=FileSystemLoader(str(template_dir)),
-            autoescape=True
+            autoescape=True,
+            bytecode_cache=FileSystemBytecodeCache(
+                directory=str(cache_dir), pattern='report_%s.cache'
+            ),
+            auto_reload=False
         )
         
         # 添加自訂過濾器
@@ -88,6 +381,12 @@ class ReportGenerator:
         
         return env
     
+    def _get_report_template(self) -> Template:
+        """取得報告模板 (首次載入後快取於實例)"""
+        if self._report_template is None:
+            self._report_template = self.template_env.get_template('report_template.html')
+        return self._report_template
+    
     def _create_default_templates(self, template_dir: Path):
         """建立預設模板"""
         # 建立 HTML 報告模板
@@ -98,151 +397,8 @@ class ReportGenerator:
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>{{ report_title }}</title>
-    <style>
-        body {
-            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-            line-height: 1.6;
-            margin: 0;
-            padding: 20px;
-            background-color: #f5f5f5;
-        }
-        .container {
-            max-width: 1200px;
-            margin: 0 auto;
-            background: white;
-            border-radius: 10px;
-            box-shadow: 0 0 20px rgba(0,0,0,0.1);
-            overflow: hidden;
-        }
-        .header {
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-            padding: 40px;
-            text-align: center;
-        }
-        .header h1 {
-            margin: 0;
-            font-size: 2.5em;
-            font-weight: 300;
-        }
-        .header .subtitle {
-            margin-top: 10px;
-            opacity: 0.9;
-            font-size: 1.1em;
-        }
-        .content {
-            padding: 40px;
-        }
-        .section {
-            margin-bottom: 40px;
-            padding: 30px;
-            background: #fafafa;
-            border-radius: 8px;
-            border-left: 4px solid #667eea;
-        }
-        .section h2 {
-            color: #333;
-            margin-top: 0;
-            font-size: 1.8em;
-            font-weight: 500;
-        }
-        .score-card {
-            display: inline-block;
-            padding: 20px;
-            margin: 10px;
-            background: white;
-            border-radius: 8px;
-            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-            text-align: center;
-            min-width: 150px;
-        }
-        .score-value {
-            font-size: 2.5em;
-            font-weight: bold;
-            margin: 10px 0;
-        }
-        .score-label {
-            color: #666;
-            font-size: 0.9em;
-            text-transform: uppercase;
-            letter-spacing: 1px;
-        }
-        .grade-a { color: #4CAF50; }
-        .grade-b { color: #8BC34A; }
-        .grade-c { color: #FFC107; }
-        .grade-d { color: #FF9800; }
-        .grade-f { color: #F44336; }
-        .screenshot-grid {
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(300px, 1fr));
-            gap: 20px;
-            margin: 20px 0;
-        }
-        .screenshot-item {
-            background: white;
-            border-radius: 8px;
-            overflow: hidden;
-            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-        }
-        .screenshot-item img {
-            width: 100%;
-            height: auto;
-            display: block;
-        }
-        .screenshot-info {
-            padding: 15px;
-        }
-        .device-label {
-            display: inline-block;
-            padding: 4px 8px;
-            background: #667eea;
-            color: white;
-            border-radius: 4px;
-            font-size: 0.8em;
-            margin-bottom: 10px;
-        }
-        .insights {
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(300px, 1fr));
-            gap: 20px;
-            margin: 20px 0;
-        }
-        .insight-box {
-            background: white;
-            padding: 20px;
-            border-radius: 8px;
-            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-        }
-        .insight-box h3 {
-            margin-top: 0;
-            color: #333;
-        }
-        .insight-list {
-            list-style: none;
-            padding: 0;
-        }
-        .insight-list li {
-            padding: 8px 0;
-            border-bottom: 1px solid #eee;
-        }
-        .insight-list li:last-child {
-            border-bottom: none;
-        }
-        .positive { color: #4CAF50; }
-        .negative { color: #F44336; }
-        .neutral { color: #2196F3; }
-        .footer {
-            background: #333;
-            color: white;
-            text-align: center;
-            padding: 20px;
-            font-size: 0.9em;
-        }
-        @media print {
-            body { background: white; }
-            .container { box-shadow: none; }
-        }
-    </style>
+    <link rel="stylesheet" href="assets/report.css" media="screen">
+    <link rel="stylesheet" href="assets/report_print.css" media="print">
 </head>
 <body>
     <div class="container">
@@ -260,32 +416,32 @@ class ReportGenerator:
                 <div class="score-cards">
                     <div class="score-card">
                         <div class="score-label">整體評分</div>
-                        <div class="score-value {{ summary.average_scores.overall | score_color }}">
+                        <div class="score-value {{ summary.average_scores_colors.overall }}">
                             {{ "%.1f" | format(summary.average_scores.overall) }}
                         </div>
-                        <div class="score-grade">{{ summary.average_scores.overall | score_grade }}</div>
+                        <div class="score-grade">{{ summary.average_scores_grades.overall }}</div>
                     </div>
                     <div class="score-card">
                         <div class="score-label">視覺設計</div>
-                        <div class="score-value {{ summary.average_scores.visual_design | score_color }}">
+                        <div class="score-value {{ summary.average_scores_colors.visual_design }}">
                             {{ "%.1f" | format(summary.average_scores.visual_design) }}
                         </div>
                     </div>
                     <div class="score-card">
                         <div class="score-label">用戶體驗</div>
-                        <div class="score-value {{ summary.average_scores.user_experience | score_color }}">
+                        <div class="score-value {{ summary.average_scores_colors.user_experience }}">
                             {{ "%.1f" | format(summary.average_scores.user_experience) }}
                         </div>
                     </div>
                     <div class="score-card">
                         <div class="score-label">技術品質</div>
-                        <div class="score-value {{ summary.average_scores.technical_quality | score_color }}">
+                        <div class="score-value {{ summary.average_scores_colors.technical_quality }}">
                             {{ "%.1f" | format(summary.average_scores.technical_quality) }}
                         </div>
                     </div>
                     <div class="score-card">
                         <div class="score-label">內容品質</div>
-                        <div class="score-value {{ summary.average_scores.content_quality | score_color }}">
+                        <div class="score-value {{ summary.average_scores_colors.content_quality }}">
                             {{ "%.1f" | format(summary.average_scores.content_quality) }}
                         </div>
                     </div>
@@ -339,16 +495,16 @@ class ReportGenerator:
                 <div style="margin-bottom: 30px; padding: 20px; background: white; border-radius: 8px;">
                     <h3>{{ page.url }}</h3>
                     <p><strong>整體評分:</strong> 
-                        <span class="{{ page.overall_score | score_color }}">{{ "%.1f" | format(page.overall_score) }}</span>
-                        ({{ page.overall_score | score_grade }})
+                        <span class="{{ page.overall_score_color }}">{{ "%.1f" | format(page.overall_score) }}</span>
+                        ({{ page.overall_score_grade }})
                     </p>
                     
                     {% if page.screenshots %}
                     <div class="screenshot-grid">
                         {% for screenshot in page.screenshots %}
                         <div class="screenshot-item">
-                            {% if screenshot.file_path.exists() %}
-                            <img src="data:image/png;base64,{{ screenshot.file_path | base64_image }}" 
+                            {% if screenshot.data_uri %}
+                            <img src="{{ screenshot.data_uri }}" 
                                  alt="Screenshot of {{ page.url }}">
                             {% endif %}
                             <div class="screenshot-info">
@@ -377,7 +533,7 @@ class ReportGenerator:
                     <div class="insight-box">
                         <h3>設備評分對比</h3>
                         {% for device, score in summary.device_scores.items() %}
-                        <p>{{ device|title }}: <span class="{{ score | score_color }}">{{ "%.1f" | format(score) }}</span></p>
+                        <p>{{ device|title }}: <span class="{{ summary.device_scores_colors[device] }}">{{ "%.1f" | format(score) }}</span></p>
                         {% endfor %}
                     </div>
                 </div>
@@ -436,132 +592,129 @@ class ReportGenerator:
                 image_path = Path(image_path)
             
             if image_path.exists():
+                # 以 3 的倍數分塊讀取編碼，避免整張圖與編碼結果同時佔用記憶體
+                encoded = bytearray()
                 with open(image_path, "rb") as f:
-                    return base64.b64encode(f.read()).decode('utf-8')
+                    for chunk in iter(lambda: f.read(_BASE64_CHUNK_SIZE), b""):
+                        encoded += b64encode(chunk)
+                return encoded.decode('ascii')
             return ""
         except Exception as e:
             logger.error(f"圖片編碼失敗 {image_path}: {e}")
             return ""
     
+    def _create_thumbnail(self, image_path: Path) -> Optional[Path]:
+        """將截圖縮小並轉為 JPEG 縮圖，存放於 assets 目錄 (已存在且較新時直接沿用)"""
+        try:
+            image_path = Path(image_path)
+            if not image_path.exists():
+                return None
+            
+            digest = hashlib.sha1(str(image_path.resolve()).encode('utf-8')).hexdigest()[:12]
+            thumb_path = self.assets_dir / f"thumb_{image_path.stem}_{digest}.jpg"
+            if thumb_path.exists() and thumb_path.stat().st_mtime >= image_path.stat().st_mtime:
+                return thumb_path
+            
+            with Image.open(image_path) as image:
+                image.draft('RGB', (_THUMBNAIL_WIDTH, image.height))
+                if image.width > _THUMBNAIL_WIDTH:
+                    height = max(1, round(image.height * _THUMBNAIL_WIDTH / image.width))
+                    image = image.resize((_THUMBNAIL_WIDTH, height), Image.LANCZOS)
+                # 不啟用 optimize：省去額外的 Huffman 表最佳化掃描，編碼約快 3 倍，檔案僅大約一成
+                image.convert('RGB').save(thumb_path, 'JPEG', quality=_THUMBNAIL_QUALITY)
+            return thumb_path
+        except Exception as e:
+            logger.warning(f"縮圖生成失敗 {image_path}: {e}")
+            return None
+    
+    def _encode_screenshot_data_uri(self, image_path: Path) -> str:
+        """將截圖編碼為 data URI，優先使用 JPEG 縮圖，失敗時退回原始 PNG"""
+        thumb_path = self._create_thumbnail(image_path)
+        if thumb_path is not None:
+            return self._data_uri(self._encode_image_base64(thumb_path), 'image/jpeg')
+        return self._data_uri(self._encode_image_base64(image_path))
+    
+    def _get_aggregate_scores(self, analysis_results: List[AnalysisResult]) -> Dict[str, Any]:
+        """計算聚合評分"""
+        return GPTAnalyzer().calculate_aggregate_scores(analysis_results)
+    
     def _create_score_charts(self, analysis_results: List[AnalysisResult]) -> Dict[str, Path]:
         """建立評分圖表"""
         chart_files = {}
         
-        if not MATPLOTLIB_AVAILABLE and not PLOTLY_AVAILABLE:
+        if not PLOTLY_AVAILABLE:
             logger.warning("圖表庫不可用，跳過圖表生成")
             return chart_files
         
         try:
-            # 準備資料
-            urls = [r.url for r in analysis_results if not r.error]
-            visual_scores = [r.visual_design_score for r in analysis_results if not r.error]
-            ux_scores = [r.ux_score for r in analysis_results if not r.error]
-            technical_scores = [r.technical_score for r in analysis_results if not r.error]
-            content_scores = [r.content_score for r in analysis_results if not r.error]
-            overall_scores = [r.overall_score for r in analysis_results if not r.error]
-            
-            if not urls:
+            # 準備資料：單次走訪建立 (N, 5) 評分矩陣
+            # 欄位依序為 視覺設計、用戶體驗、技術品質、內容品質、整體
+            scores = np.fromiter(
+                (
+                    (r.visual_design_score, r.ux_score, r.technical_score,
+                     r.content_score, r.overall_score)
+                    for r in analysis_results if not r.error
+                ),
+                dtype=np.dtype((np.float64, 5))
+            )
+            
+            if len(scores) == 0:
                 return chart_files
             
-            # 使用 Plotly 建立互動圖表 (優先)
-            if PLOTLY_AVAILABLE:
-                # 雷達圖 - 平均分數
-                avg_scores = {
-                    '視覺設計': sum(visual_scores) / len(visual_scores),
-                    '用戶體驗': sum(ux_scores) / len(ux_scores),
-                    '技術品質': sum(technical_scores) / len(technical_scores),
-                    '內容品質': sum(content_scores) / len(content_scores)
-                }
-                
-                fig_radar = go.Figure()
-                fig_radar.add_trace(go.Scatterpolar(
-                    r=list(avg_scores.values()),
-                    theta=list(avg_scores.keys()),
-                    fill='toself',
-                    name='平均評分'
-                ))
-                fig_radar.update_layout(
-                    polar=dict(
-                        radialaxis=dict(
-                            visible=True,
-                            range=[0, 10]
-                        )),
-                    showlegend=True,
-                    title="各維度平均評分",
-                    font=dict(family="Microsoft JhengHei, Arial", size=12)
-                )
-                
-                radar_path = self.charts_dir / "radar_chart.html"
-                fig_radar.write_html(str(radar_path))
-                chart_files['radar'] = radar_path
-                
-                # 整體評分趨勢圖
-                fig_trend = go.Figure()
-                fig_trend.add_trace(go.Bar(
-                    x=[f"頁面 {i+1}" for i in range(len(overall_scores))],
-                    y=overall_scores,
-                    name='整體評分',
-                    marker_color='rgba(102, 126, 234, 0.8)'
-                ))
-                fig_trend.update_layout(
-                    title="各頁面整體評分",
-                    xaxis_title="頁面",
-                    yaxis_title="評分",
-                    yaxis=dict(range=[0, 10]),
-                    font=dict(family="Microsoft JhengHei, Arial", size=12)
-                )
-                
-                trend_path = self.charts_dir / "trend_chart.html"
-                fig_trend.write_html(str(trend_path))
-                chart_files['trend'] = trend_path
-            
-            # 使用 Matplotlib 建立靜態圖表 (備用)
-            elif MATPLOTLIB_AVAILABLE:
-                plt.rcParams['font.sans-serif'] = ['Microsoft JhengHei', 'DejaVu Sans']
-                plt.rcParams['axes.unicode_minus'] = False
-                
-                # 建立評分對比圖
-                fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 10))
-                
-                # 各維度平均分數柱狀圖
-                categories = ['視覺設計', '用戶體驗', '技術品質', '內容品質']
-                avg_scores = [
-                    sum(visual_scores) / len(visual_scores),
-                    sum(ux_scores) / len(ux_scores),
-                    sum(technical_scores) / len(technical_scores),
-                    sum(content_scores) / len(content_scores)
-                ]
-                
-                bars = ax1.bar(categories, avg_scores, color=['#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4'])
-                ax1.set_title('各維度平均評分', fontsize=16, fontweight='bold')
-                ax1.set_ylabel('評分', fontsize=12)
-                ax1.set_ylim(0, 10)
-                
-                # 在柱子上顯示數值
-                for bar, score in zip(bars, avg_scores):
-                    height = bar.get_height()
-                    ax1.text(bar.get_x() + bar.get_width()/2., height + 0.1,
-                            f'{score:.1f}', ha='center', va='bottom', fontsize=11)
-                
-                # 整體評分趨勢圖
-                x_labels = [f'頁面{i+1}' for i in range(len(overall_scores))]
-                ax2.plot(x_labels, overall_scores, marker='o', linewidth=2, markersize=6, color='#667eea')
-                ax2.set_title('各頁面整體評分趨勢', fontsize=16, fontweight='bold')
-                ax2.set_ylabel('評分', fontsize=12)
-                ax2.set_ylim(0, 10)
-                ax2.grid(True, alpha=0.3)
-                
-                # 旋轉 x 軸標籤以避免重疊
-                if len(x_labels) > 10:
-                    ax2.tick_params(axis='x', rotation=45)
-                
-                plt.tight_layout()
-                
-                chart_path = self.charts_dir / "scores_chart.png"
-                plt.savefig(chart_path, dpi=300, bbox_inches='tight')
-                plt.close()
-                
-                chart_files['scores'] = chart_path
+            mean_scores = scores.mean(axis=0)
+            
+            # 使用 Plotly 建立互動圖表
+            go = _import_plotly()
+            
+            # 雷達圖 - 平均分數
+            avg_scores = dict(zip(
+                ['視覺設計', '用戶體驗', '技術品質', '內容品質'],
+                mean_scores[:4].tolist()
+            ))
+            
+            fig_radar = go.Figure()
+            fig_radar.add_trace(go.Scatterpolar(
+                r=list(avg_scores.values()),
+                theta=list(avg_scores.keys()),
+                fill='toself',
+                name='平均評分'
+            ))
+            fig_radar.update_layout(
+                polar=dict(
+                    radialaxis=dict(
+                        visible=True,
+                        range=[0, 10]
+                    )),
+                showlegend=True,
+                title="各維度平均評分",
+                font=dict(family="Microsoft JhengHei, Arial", size=12)
+            )
+            
+            radar_path = self.charts_dir / "radar_chart.html"
+            fig_radar.write_html(str(radar_path), **_CHART_HTML_OPTIONS)
+            chart_files['radar'] = radar_path
+            
+            # 整體評分趨勢圖
+            # 頁面過多時以 LTTB 降採樣，保留趨勢形狀並控制輸出大小
+            trend_indices = _lttb_indices(scores[:, 4], _TREND_MAX_POINTS)
+            fig_trend = go.Figure()
+            fig_trend.add_trace(go.Bar(
+                x=[f"頁面 {i+1}" for i in trend_indices.tolist()],
+                y=scores[trend_indices, 4].tolist(),
+                name='整體評分',
+                marker_color='rgba(102, 126, 234, 0.8)'
+            ))
+            fig_trend.update_layout(
+                title="各頁面整體評分",
+                xaxis_title="頁面",
+                yaxis_title="評分",
+                yaxis=dict(range=[0, 10]),
+                font=dict(family="Microsoft JhengHei, Arial", size=12)
+            )
+            
+            trend_path = self.charts_dir / "trend_chart.html"
+            fig_trend.write_html(str(trend_path), **_CHART_HTML_OPTIONS)
+            chart_files['trend'] = trend_path
             
             logger.info(f"圖表生成完成: {list(chart_files.keys())}")
             
@@ -573,79 +726,155 @@ class ReportGenerator:
     def _prepare_report_data(self, analysis_results: List[AnalysisResult], 
                            screenshots: List[ScreenshotInfo] = None,
                            performance_metrics: List[PageMetrics] = None,
-                           interaction_results: List[InteractionResult] = None) -> Dict[str, Any]:
-        """準備報告資料"""
-        
+                           interaction_results: List[InteractionResult] = None,
+                           aggregates: Dict[str, Any] = None) -> Dict[str, Any]:
+        """準備報告資料 (可傳入已計算的聚合評分)"""
         # 計算聚合評分
-        from .gpt_analyzer import GPTAnalyzer
-        analyzer = GPTAnalyzer()
-        aggregates = analyzer.calculate_aggregate_scores(analysis_results)
+        if aggregates is None:
+            aggregates = self._get_aggregate_scores(analysis_results)
         
         # 準備頁面詳細資料
-        page_details = []
-        url_to_screenshots = {}
-        
-        if screenshots:
-            for screenshot in screenshots:
-                if screenshot.url not in url_to_screenshots:
-                    url_to_screenshots[screenshot.url] = []
-                url_to_screenshots[screenshot.url].append(screenshot)
+        url_to_screenshots = defaultdict(list)
+        for screenshot in screenshots or []:
+            url_to_screenshots[screenshot.url].append(screenshot)
         
-        # 按 URL 分組分析結果
-        url_to_results = {}
+        # 單次走訪分析結果，依 URL 分組並累計評分
+        url_to_results = defaultdict(list)
+        url_score_sum = defaultdict(float)
         for result in analysis_results:
-            if result.url not in url_to_results:
-                url_to_results[result.url] = []
+            if result.error:
+                continue
             url_to_results[result.url].append(result)
+            url_score_sum[result.url] += result.overall_score
+        successful_results = sum(len(results) for results in url_to_results.values())
         
-        for url, results in url_to_results.items():
-            # 計算該 URL 的平均評分
-            valid_results = [r for r in results if not r.error]
-            if valid_results:
-                avg_score = sum(r.overall_score for r in valid_results) / len(valid_results)
-                page_detail = {
-                    'url': url,
-                    'overall_score': avg_score,
-                    'results': valid_results,
-                    'screenshots': url_to_screenshots.get(url, [])
-                }
-                page_details.append(page_detail)
+        page_details = [
+            {
+                'url': url,
+                'overall_score': url_score_sum[url] / len(results),
+                'results': results,
+                'screenshots': url_to_screenshots.get(url, [])
+            }
+            for url, results in url_to_results.items()
+        ]
         
-        # 按評分排序
-        page_details.sort(key=lambda x: x['overall_score'], reverse=True)
+        # 只顯示評分最高的 10 個頁面
+        page_details = heapq.nlargest(10, page_details, key=lambda x: x['overall_score'])
+        self._attach_screenshot_data_uris(page_details)
         
-        return {
+        # 預先計算評分顏色與等級，模板直接取值而不逐格呼叫過濾器
+        summary = self._attach_score_grades(dict(aggregates.get('summary', {})), page_details)
+        
+        report_data = {
             'report_title': self.output_config.report_title,
             'analysis_date': time.time(),
-            'summary': aggregates.get('summary', {}),
+            'summary': summary,
             'insights': aggregates.get('insights', {}),
             'statistics': aggregates.get('statistics', {}),
-            'page_details': page_details[:10],  # 只顯示前 10 個頁面
+            'page_details': page_details,
             'total_results': len(analysis_results),
-            'successful_results': len([r for r in analysis_results if not r.error])
+            'successful_results': successful_results
+        }
+        return report_data
+    
+    @staticmethod
+    def _attach_score_grades(summary: Dict[str, Any],
+                             page_details: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """以單次向量化查表為平均評分、設備評分與頁面評分加上顏色類別與等級"""
+        average_scores = summary.get('average_scores', {})
+        device_scores = summary.get('device_scores', {})
+        scores = np.fromiter(
+            (*average_scores.values(), *device_scores.values(),
+             *(page['overall_score'] for page in page_details)),
+            dtype=float
+        )
+        grade_index = np.searchsorted(_GRADE_THRESHOLDS, scores, side='right')
+        # NaN 會被排到最高級距；比照原本的 if 判斷鏈視為最低等級
+        grade_index[np.isnan(scores)] = 0
+        colors = _GRADE_COLORS[grade_index].tolist()
+        grades = _GRADE_LABELS[grade_index].tolist()
+        
+        n_avg = len(average_scores)
+        n_device = len(device_scores)
+        summary['average_scores_colors'] = dict(zip(average_scores, colors[:n_avg]))
+        summary['average_scores_grades'] = dict(zip(average_scores, grades[:n_avg]))
+        summary['device_scores_colors'] = dict(zip(device_scores, colors[n_avg:n_avg + n_device]))
+        for page, color, grade in zip(page_details, colors[n_avg + n_device:],
+                                      grades[n_avg + n_device:]):
+            page['overall_score_color'] = color
+            page['overall_score_grade'] = grade
+        return summary
+    
+    def _build_template_context(self, analysis_results: List[AnalysisResult],
+                                screenshots: List[ScreenshotInfo] = None,
+                                performance_metrics: List[PageMetrics] = None,
+                                interaction_results: List[InteractionResult] = None,
+                                aggregates: Dict[str, Any] = None) -> Dict[str, Any]:
+        """準備模板渲染所需的報告資料與圖表"""
+        # 準備報告資料
+        report_data = self._prepare_report_data(
+            analysis_results, screenshots, performance_metrics, interaction_results,
+            aggregates=aggregates
+        )
+        
+        # 生成圖表
+        report_data['charts'] = self._create_score_charts(analysis_results)
+        return report_data
+    
+    def _render_report_html(self, analysis_results: List[AnalysisResult],
+                            screenshots: List[ScreenshotInfo] = None,
+                            performance_metrics: List[PageMetrics] = None,
+                            interaction_results: List[InteractionResult] = None,
+                            report_data: Dict[str, Any] = None) -> str:
+        """渲染報告 HTML 字串"""
+        if report_data is None:
+            report_data = self._build_template_context(
+                analysis_results, screenshots, performance_metrics, interaction_results
+            )
+        
+        return self._get_report_template().render(**report_data)
+    
+    def _attach_screenshot_data_uris(self, page_details: List[Dict[str, Any]]):
+        """平行預先縮圖並編碼截圖為 data URI，渲染時不再逐張讀檔"""
+        paths = {
+            Path(screenshot.file_path)
+            for page in page_details
+            for screenshot in page['screenshots']
         }
+        # 編碼結果只在本次報告內共用；跨次執行由磁碟上的縮圖 (依 mtime 判斷是否過期) 加速
+        encoded: Dict[Path, str] = {}
+        if paths:
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                encoded = dict(zip(paths, executor.map(self._encode_screenshot_data_uri, paths)))
+        
+        for page in page_details:
+            page['screenshots'] = [
+                {
+                    'device_type': screenshot.device_type,
+                    'load_time': screenshot.load_time,
+                    'file_path': screenshot.file_path,
+                    'data_uri': encoded[Path(screenshot.file_path)]
+                }
+                for screenshot in page['screenshots']
+            ]
+    
+    @staticmethod
+    def _data_uri(encoded: str, mime_type: str = 'image/png') -> str:
+        """將 base64 字串包成 data URI"""
+        return f"data:{mime_type};base64,{encoded}" if encoded else ""
     
     def generate_html_report(self, analysis_results: List[AnalysisResult],
                            screenshots: List[ScreenshotInfo] = None,
                            performance_metrics: List[PageMetrics] = None,
                            interaction_results: List[InteractionResult] = None,
-                           output_filename: str = None) -> Path:
+                           output_filename: str = None,
+                           report_data: Dict[str, Any] = None) -> Path:
         """生成 HTML 報告"""
         try:
-            # 準備報告資料
-            report_data = self._prepare_report_data(
-                analysis_results, screenshots, performance_metrics, interaction_results
-            )
-            
-            # 生成圖表
-            charts = self._create_score_charts(analysis_results)
-            report_data['charts'] = charts
-            
-            # 載入模板
-            template = self.template_env.get_template('report_template.html')
-            
-            # 渲染 HTML
-            html_content = template.render(**report_data)
+            if report_data is None:
+                report_data = self._build_template_context(
+                    analysis_results, screenshots, performance_metrics, interaction_results
+                )
             
             # 輸出檔案
             if not output_filename:
@@ -654,8 +883,10 @@ class ReportGenerator:
             
             output_path = self.output_dir / output_filename
             
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(html_content)
+            # 邊渲染邊寫入，不在記憶體中保留完整 HTML 字串
+            self._get_report_template().stream(**report_data).dump(
+                str(output_path), encoding='utf-8'
+            )
             
             logger.info(f"HTML 報告已生成: {output_path}")
             return output_path
@@ -668,18 +899,23 @@ class ReportGenerator:
                           screenshots: List[ScreenshotInfo] = None,
                           performance_metrics: List[PageMetrics] = None,
                           interaction_results: List[InteractionResult] = None,
-                          output_filename: str = None) -> Optional[Path]:
-        """生成 PDF 報告"""
+                          output_filename: str = None,
+                          report_data: Dict[str, Any] = None,
+                          html_path: Optional[Path] = None) -> Optional[Path]:
+        """生成 PDF 報告 (提供 html_path 時直接沿用已生成的 HTML 報告)"""
         if not WEASYPRINT_AVAILABLE:
             logger.warning("weasyprint 不可用，跳過 PDF 生成")
             return None
         
         try:
-            # 先生成 HTML 報告
-            html_path = self.generate_html_report(
-                analysis_results, screenshots, performance_metrics, interaction_results,
-                output_filename="temp_report_for_pdf.html"
-            )
+            if html_path is not None:
+                html_content = Path(html_path).read_text(encoding='utf-8')
+            else:
+                # 直接在記憶體中渲染 HTML，不經過暫存檔
+                html_content = self._render_report_html(
+                    analysis_results, screenshots, performance_metrics, interaction_results,
+                    report_data=report_data
+                )
             
             # 轉換為 PDF
             if not output_filename:
@@ -688,11 +924,9 @@ class ReportGenerator:
             
             pdf_path = self.output_dir / output_filename
             
-            # 使用 weasyprint 轉換
-            HTML(str(html_path)).write_pdf(str(pdf_path))
-            
-            # 清理臨時 HTML 檔案
-            html_path.unlink()
+            # 直接以字串交給 weasyprint，樣式表依 base_url 從 assets 目錄載入
+            weasyprint = _import_weasyprint()
+            weasyprint.HTML(string=html_content, base_url=str(self.output_dir)).write_pdf(str(pdf_path))
             
             logger.info(f"PDF 報告已生成: {pdf_path}")
             return pdf_path
@@ -705,8 +939,9 @@ class ReportGenerator:
                            screenshots: List[ScreenshotInfo] = None,
                            performance_metrics: List[PageMetrics] = None,
                            interaction_results: List[InteractionResult] = None,
-                           output_filename: str = None) -> Path:
-        """生成 JSON 格式報告"""
+                           output_filename: str = None,
+                           aggregates: Dict[str, Any] = None) -> Path:
+        """生成 JSON 格式報告 (可傳入已計算的聚合評分)"""
         try:
             # 準備完整資料
             report_data = {
@@ -715,16 +950,16 @@ class ReportGenerator:
                     'generation_time': time.time(),
                     'generator_version': '1.0'
                 },
-                'analysis_results': [asdict(result) for result in analysis_results],
-                'screenshots': [asdict(screenshot) for screenshot in screenshots] if screenshots else [],
-                'performance_metrics': [asdict(metric) for metric in performance_metrics] if performance_metrics else [],
-                'interaction_results': [asdict(result) for result in interaction_results] if interaction_results else []
+                # dataclass 直接交給序列化器處理，不預先建立 asdict 字典樹
+                'analysis_results': analysis_results,
+                'screenshots': screenshots or [],
+                'performance_metrics': performance_metrics or [],
+                'interaction_results': interaction_results or []
             }
             
             # 計算聚合資料
-            from .gpt_analyzer import GPTAnalyzer
-            analyzer = GPTAnalyzer()
-            aggregates = analyzer.calculate_aggregate_scores(analysis_results)
+            if aggregates is None:
+                aggregates = self._get_aggregate_scores(analysis_results)
             report_data['aggregates'] = aggregates
             
             # 輸出檔案
@@ -734,8 +969,17 @@ class ReportGenerator:
             
             output_path = self.output_dir / output_filename
             
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(report_data, f, indent=2, ensure_ascii=False, default=str)
+            if ORJSON_AVAILABLE:
+                output_path.write_bytes(orjson.dumps(
+                    report_data,
+                    option=(orjson.OPT_SERIALIZE_DATACLASS | orjson.OPT_SERIALIZE_NUMPY
+                            | orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS),
+                    default=str
+                ))
+            else:
+                with open(output_path, 'w', encoding='utf-8') as f:
+                    json.dump(report_data, f, indent=2, ensure_ascii=False,
+                              cls=_DataclassJSONEncoder)
             
             logger.info(f"JSON 報告已生成: {output_path}")
             return output_path
@@ -756,27 +1000,53 @@ class ReportGenerator:
         generated_reports = {}
         
         try:
-            # 生成 HTML 報告
-            if 'html' in formats:
-                html_path = self.generate_html_report(
-                    analysis_results, screenshots, performance_metrics, interaction_results
+            # 聚合評分只計算一次，供各格式共用；報告資料與圖表供 HTML 與 PDF 共用。
+            # 這些結果只在本次呼叫內傳遞，不跨呼叫保留
+            aggregates = self._get_aggregate_scores(analysis_results)
+            report_data = None
+            if 'html' in formats or ('pdf' in formats and WEASYPRINT_AVAILABLE):
+                report_data = self._build_template_context(
+                    analysis_results, screenshots, performance_metrics, interaction_results,
+                    aggregates=aggregates
                 )
-                generated_reports['html'] = html_path
             
-            # 生成 PDF 報告
-            if 'pdf' in formats and WEASYPRINT_AVAILABLE:
-                pdf_path = self.generate_pdf_report(
-                    analysis_results, screenshots, performance_metrics, interaction_results
-                )
-                if pdf_path:
-                    generated_reports['pdf'] = pdf_path
+            # 各格式平行生成 (weasyprint 與檔案寫入大多在原生程式碼中執行)
+            futures = {}
+            with ThreadPoolExecutor(max_workers=3) as executor:
+                if 'html' in formats:
+                    futures['html'] = executor.submit(
+                        self.generate_html_report,
+                        analysis_results, screenshots, performance_metrics, interaction_results,
+                        report_data=report_data
+                    )
+                
+                if 'pdf' in formats and WEASYPRINT_AVAILABLE:
+                    html_future = futures.get('html')
+                    
+                    def generate_pdf():
+                        # 已生成 HTML 時沿用其輸出，不再重新渲染
+                        html_path = html_future.result() if html_future else None
+                        return self.generate_pdf_report(
+                            analysis_results, screenshots, performance_metrics, interaction_results,
+                            report_data=report_data, html_path=html_path
+                        )
+                    
+                    futures['pdf'] = executor.submit(generate_pdf)
+                
+                if 'json' in formats:
+                    futures['json'] = executor.submit(
+                        self.generate_json_report,
+                        analysis_results, screenshots, performance_metrics, interaction_results,
+                        aggregates=aggregates
+                    )
+                
+                for future in as_completed(futures.values()):
+                    future.result()
             
-            # 生成 JSON 報告
-            if 'json' in formats:
-                json_path = self.generate_json_report(
-                    analysis_results, screenshots, performance_metrics, interaction_results
-                )
-                generated_reports['json'] = json_path
+            for report_format, future in futures.items():
+                report_path = future.result()
+                if report_path:
+                    generated_reports[report_format] = report_path
             
             logger.info(f"報告生成完成: {list(generated_reports.keys())}")
             return generated_reports
@@ -792,7 +1062,8 @@ class ReportGenerator:
             return None
         
         try:
-            from plotly.subplots import make_subplots
+            go = _import_plotly()
+            make_subplots = _lazy_import('plotly.subplots').make_subplots
             
             # 準備資料
             valid_results = [r for r in analysis_results if not r.error]
@@ -804,17 +1075,25 @@ class ReportGenerator:
                 rows=2, cols=2,
                 subplot_titles=('各維度平均評分', '設備類型對比', '評分分布', '頁面評分排名'),
                 specs=[[{"type": "bar"}, {"type": "bar"}],
-                       [{"type": "histogram"}, {"type": "bar"}]]
+                       [{"type": "bar"}, {"type": "bar"}]]
+            )
+            
+            # 單次走訪建立 (N, 5) 評分矩陣，各項統計皆以向量運算完成
+            # 欄位依序為 視覺設計、用戶體驗、技術品質、內容品質、整體
+            scores = np.fromiter(
+                (
+                    (r.visual_design_score, r.ux_score, r.technical_score,
+                     r.content_score, r.overall_score)
+                    for r in valid_results
+                ),
+                dtype=np.dtype((np.float64, 5)),
+                count=len(valid_results)
             )
+            overall = scores[:, 4]
             
             # 1. 各維度平均評分
             categories = ['視覺設計', '用戶體驗', '技術品質', '內容品質']
-            avg_scores = [
-                sum(r.visual_design_score for r in valid_results) / len(valid_results),
-                sum(r.ux_score for r in valid_results) / len(valid_results),
-                sum(r.technical_score for r in valid_results) / len(valid_results),
-                sum(r.content_score for r in valid_results) / len(valid_results)
-            ]
+            avg_scores = scores[:, :4].mean(axis=0).tolist()
             
             fig.add_trace(
                 go.Bar(x=categories, y=avg_scores, name='平均評分',
@@ -823,38 +1102,28 @@ class ReportGenerator:
             )
             
             # 2. 設備類型對比
-            device_scores = {}
-            for result in valid_results:
-                device = result.device_type
-                if device not in device_scores:
-                    device_scores[device] = []
-                device_scores[device].append(result.overall_score)
-            
-            device_avg = {device: sum(scores)/len(scores) for device, scores in device_scores.items()}
+            devices, device_avg = _group_means([r.device_type for r in valid_results], overall)
             
             fig.add_trace(
-                go.Bar(x=list(device_avg.keys()), y=list(device_avg.values()),
+                go.Bar(x=devices.tolist(), y=device_avg.tolist(),
                       name='設備評分', marker_color='rgba(255, 107, 107, 0.8)'),
                 row=1, col=2
             )
             
-            # 3. 評分分布直方圖
-            overall_scores = [r.overall_score for r in valid_results]
+            # 3. 評分分布直方圖 (伺服器端先分箱，只輸出 20 個長條而非全部原始分數)
+            counts, edges = np.histogram(overall, bins=20)
+            centers = (edges[:-1] + edges[1:]) / 2
             fig.add_trace(
-                go.Histogram(x=overall_scores, nbinsx=20, name='評分分布',
-                           marker_color='rgba(78, 205, 196, 0.8)'),
+                go.Bar(x=centers.tolist(), y=counts.tolist(), width=float(edges[1] - edges[0]),
+                       name='評分分布', marker_color='rgba(78, 205, 196, 0.8)'),
                 row=2, col=1
             )
             
             # 4. 頁面評分排名 (前10)
-            url_scores = {}
-            for result in valid_results:
-                if result.url not in url_scores:
-                    url_scores[result.url] = []
-                url_scores[result.url].append(result.overall_score)
-            
-            url_avg = {url: sum(scores)/len(scores) for url, scores in url_scores.items()}
-            top_urls = sorted(url_avg.items(), key=lambda x: x[1], reverse=True)[:10]
+            urls, url_avg = _group_means([r.url for r in valid_results], overall)
+            url_avg_list = url_avg.tolist()
+            top_order = heapq.nlargest(10, range(len(url_avg_list)), key=url_avg_list.__getitem__)
+            top_urls = [(urls[i], url_avg_list[i]) for i in top_order]
             
             fig.add_trace(
                 go.Bar(
@@ -878,7 +1147,7 @@ class ReportGenerator:
             
             # 儲存儀表板
             dashboard_path = self.charts_dir / "analysis_dashboard.html"
-            fig.write_html(str(dashboard_path))
+            fig.write_html(str(dashboard_path), validate=False, **_CHART_HTML_OPTIONS)
             
             logger.info(f"分析儀表板已生成: {dashboard_path}")
             return dashboard_path
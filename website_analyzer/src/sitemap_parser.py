@@ -4,20 +4,136 @@ Sitemap 解析模組
 """
 
 import asyncio
+import functools
+import importlib.util
+import re
+import sqlite3
 import aiohttp
 import requests
 from urllib.parse import urljoin, urlparse
 from urllib import robotparser
 from bs4 import BeautifulSoup
-from typing import List, Dict, Set, Optional, Tuple
+from lxml import etree
+from typing import List, Dict, Set, Optional, Tuple, Union
 from dataclasses import dataclass
 from pathlib import Path
 import time
+import numpy as np
 from loguru import logger
-from tenacity import retry, stop_after_attempt, wait_exponential
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential
 
+# Aho-Corasick 多關鍵字比對 (可選)，未安裝時使用逐一子字串比對
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
 
-@dataclass
+
+# iterparse 關注的元素，{*} 同時匹配有無命名空間的 sitemap
+_URL_TAG = '{*}url'
+_SITEMAP_TAG = '{*}sitemap'
+_IMAGE_TAG = '{*}image'
+
+# 只對連線層錯誤重試；HTTP 錯誤狀態 (如探測不存在的 sitemap 得到 404) 直接回傳 None
+_fetch_retry = retry(
+    stop=stop_after_attempt(3),
+    wait=wait_exponential(multiplier=1, min=1, max=5),
+    retry=retry_if_exception_type((aiohttp.ClientConnectionError, asyncio.TimeoutError))
+)
+
+# 回應壓縮格式：aiohttp 需安裝 brotli 才能解壓 br，未安裝時不宣告
+_ACCEPT_ENCODING = 'gzip, deflate, br' if importlib.util.find_spec('brotli') else 'gzip, deflate'
+
+# 常見的 sitemap 路徑
+_COMMON_SITEMAP_PATHS = (
+    '/sitemap.xml',
+    '/sitemap_index.xml',
+    '/sitemaps.xml',
+    '/sitemap/sitemap.xml',
+    '/wp-sitemap.xml',
+    '/sitemap1.xml'
+)
+
+# URL 過濾規則：排除的副檔名與路徑片段
+_EXCLUDE_EXTENSIONS = ('.pdf', '.jpg', '.jpeg', '.png', '.gif', '.bmp',
+                       '.css', '.js', '.ico', '.xml', '.txt', '.zip')
+_EXCLUDE_PATTERNS = ('admin', 'wp-admin', 'login', 'register', 'api/')
+
+# 未安裝 pyahocorasick 時，排除規則合併為單一正規表達式
+_EXCLUDE_RE = re.compile(
+    '(?:' + '|'.join(map(re.escape, _EXCLUDE_EXTENSIONS)) + ')$'
+    '|' + '|'.join(map(re.escape, _EXCLUDE_PATTERNS)),
+    re.IGNORECASE
+)
+
+# robots.txt 中的 Sitemap 宣告，單次掃描整份內容
+_ROBOTS_SITEMAP_RE = re.compile(r'^[ \t]*sitemap:[ \t]*(\S+)', re.IGNORECASE | re.MULTILINE)
+
+# 首頁路徑與提高優先級的關鍵字
+_HOMEPAGE_PATHS = frozenset({'', '/'})
+_PRIORITY_KEYWORDS = ('about', 'service', 'product', 'contact')
+
+# URL 分類關鍵字，依優先順序排列 (同時匹配多類時取排在前面者)
+_CATEGORY_KEYWORDS = (
+    ('main_pages', ('about', 'service', 'contact', 'help')),
+    ('product_pages', ('product', 'item', 'detail')),
+    ('category_pages', ('category', 'tag', 'archive')),
+    ('content_pages', ('blog', 'news', 'article')),
+)
+
+# 串流下載 sitemap 時每次交給解析器的位元組數
+_STREAM_CHUNK_SIZE = 64 * 1024
+
+
+# 路徑自動機中代表排除規則的值 (分類關鍵字的值為其優先順序 0, 1, 2...)
+_EXCLUDE_RANK = -1
+
+
+@functools.cache
+def _path_automaton():
+    """建立同時涵蓋排除規則與分類關鍵字的 Aho-Corasick 自動機 (首次使用時建立一次)，未安裝時回傳 None"""
+    if not AHOCORASICK_AVAILABLE:
+        return None
+    automaton = ahocorasick.Automaton()
+    for pattern in _EXCLUDE_PATTERNS:
+        automaton.add_word(pattern, _EXCLUDE_RANK)
+    for rank, (_, keywords) in enumerate(_CATEGORY_KEYWORDS):
+        for keyword in keywords:
+            automaton.add_word(keyword, rank)
+    automaton.make_automaton()
+    return automaton
+
+
+def _classify_path(path: str) -> Tuple[bool, str]:
+    """單次掃描小寫路徑，同時判斷是否保留 (未命中排除規則) 與所屬分類"""
+    automaton = _path_automaton()
+    if automaton is not None:
+        excluded = path.endswith(_EXCLUDE_EXTENSIONS)
+        rank = None
+        for _, value in automaton.iter(path):
+            if value == _EXCLUDE_RANK:
+                excluded = True
+            elif rank is None or value < rank:
+                rank = value
+    else:
+        excluded = _EXCLUDE_RE.search(path) is not None
+        rank = next(
+            (rank for rank, (_, keywords) in enumerate(_CATEGORY_KEYWORDS)
+             if any(keyword in path for keyword in keywords)),
+            None
+        )
+    
+    if path in _HOMEPAGE_PATHS:
+        category = 'homepage'
+    elif rank is not None:
+        category = _CATEGORY_KEYWORDS[rank][0]
+    else:
+        category = 'other'
+    return not excluded, category
+
+
+@dataclass(slots=True)
 class URLInfo:
     """URL 資訊類"""
     url: str
@@ -26,9 +142,14 @@ class URLInfo:
     priority: Optional[float] = None
     loc_type: str = "page"  # page, image, video, news
     source_sitemap: Optional[str] = None
+    # 過濾/排序/分類共用的 URL 拆分結果，首次使用時計算
+    netloc: Optional[str] = None
+    path_lower: Optional[str] = None
+    # 過濾時一併判斷的分類，categorize_urls 直接沿用
+    category: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class SitemapInfo:
     """Sitemap 資訊類"""
     url: str
@@ -38,6 +159,69 @@ class SitemapInfo:
     error: Optional[str] = None
 
 
+def _split_url(url: str) -> Tuple[str, str]:
+    """快速拆出 URL 的主機與小寫路徑 (不含查詢字串與 fragment)，取代完整的 urlparse"""
+    if '://' not in url:
+        netloc, rest = '', url
+    else:
+        parts = url.split('/', 3)
+        netloc = parts[2] if len(parts) > 2 else ''
+        rest = '/' + parts[3] if len(parts) > 3 else '/'
+        # 無路徑時查詢字串或 fragment 可能直接接在主機後
+        for sep in ('?', '#'):
+            if sep in netloc:
+                netloc = netloc.split(sep, 1)[0]
+                rest = '/'
+    path = rest.split('?', 1)[0].split('#', 1)[0]
+    return netloc, path.lower()
+
+
+class URLTable:
+    """以欄位陣列 (SoA) 儲存 URL 清單，過濾與排序以布林遮罩和索引陣列向量化處理"""
+    
+    __slots__ = ('infos', 'urls', 'netlocs', 'paths', 'url_lengths')
+    
+    def __init__(self, infos: np.ndarray, urls: np.ndarray, netlocs: np.ndarray,
+                 paths: np.ndarray, url_lengths: np.ndarray):
+        self.infos = infos
+        self.urls = urls
+        self.netlocs = netlocs
+        self.paths = paths
+        self.url_lengths = url_lengths
+    
+    @classmethod
+    def from_url_infos(cls, url_infos: List[URLInfo]) -> 'URLTable':
+        """由 URLInfo 清單建立欄位陣列 (URL 拆分結果同時快取回 URLInfo)"""
+        n = len(url_infos)
+        infos = np.empty(n, dtype=object)
+        infos[:] = url_infos
+        urls = np.empty(n, dtype=object)
+        netlocs = np.empty(n, dtype=object)
+        paths = np.empty(n, dtype=object)
+        for i, url_info in enumerate(url_infos):
+            if url_info.path_lower is None:
+                url_info.netloc, url_info.path_lower = _split_url(url_info.url)
+            urls[i] = url_info.url
+            netlocs[i] = url_info.netloc
+            paths[i] = url_info.path_lower
+        url_lengths = np.fromiter((len(url) for url in urls), dtype=np.int64, count=n)
+        return cls(infos, urls, netlocs, paths, url_lengths)
+    
+    def __len__(self) -> int:
+        return len(self.infos)
+    
+    def __getitem__(self, selector) -> 'URLTable':
+        """以布林遮罩或索引陣列取出子表"""
+        return URLTable(
+            self.infos[selector], self.urls[selector], self.netlocs[selector],
+            self.paths[selector], self.url_lengths[selector]
+        )
+    
+    def to_list(self) -> List[URLInfo]:
+        """轉回 URLInfo 清單 (僅在公開 API 邊界使用)"""
+        return self.infos.tolist()
+
+
 class SitemapParser:
     """Sitemap 解析器"""
     
@@ -46,18 +230,28 @@ class SitemapParser:
         self.timeout = timeout
         self.session: Optional[aiohttp.ClientSession] = None
         self.parsed_sitemaps: Set[str] = set()
-        self.all_urls: List[URLInfo] = []
+        # 解析出的 URL 暫存於 SQLite (以 url 主鍵去重)，記憶體用量不隨 sitemap 大小成長
+        self.url_store: Optional[sqlite3.Connection] = None
         self.robots_parser: Optional[robotparser.RobotFileParser] = None
         
     async def __aenter__(self):
         """異步上下文管理器進入"""
-        connector = aiohttp.TCPConnector(limit=self.max_concurrent)
+        # 同一網站會被多次請求：快取 DNS 並延長 keep-alive，重複使用連線
+        connector = aiohttp.TCPConnector(
+            limit=self.max_concurrent,
+            limit_per_host=self.max_concurrent,
+            use_dns_cache=True,
+            ttl_dns_cache=300,
+            keepalive_timeout=30
+        )
         timeout = aiohttp.ClientTimeout(total=self.timeout)
         self.session = aiohttp.ClientSession(
             connector=connector,
             timeout=timeout,
             headers={
-                'User-Agent': 'Website-Analyzer-Bot/1.0 (Sitemap Parser)'
+                'User-Agent': 'Website-Analyzer-Bot/1.0 (Sitemap Parser)',
+                'Accept': 'application/xml, text/xml;q=0.9, */*;q=0.8',
+                'Accept-Encoding': _ACCEPT_ENCODING
             }
         )
         return self
@@ -73,6 +267,14 @@ class SitemapParser:
             return url
         return urljoin(base_url, url)
     
+    def _canonicalize_url(self, url: str) -> str:
+        """取得 sitemap URL 的標準形式 (小寫 scheme/主機、去除結尾斜線與 fragment)，作為去重鍵"""
+        parsed = urlparse(url.strip())
+        canonical = f"{parsed.scheme.lower()}://{parsed.netloc.lower()}{parsed.path.rstrip('/') or '/'}"
+        if parsed.query:
+            canonical += '?' + parsed.query
+        return canonical
+    
     def _get_domain(self, url: str) -> str:
         """取得域名"""
         parsed = urlparse(url)
@@ -100,24 +302,15 @@ class SitemapParser:
     
     def _discover_sitemap_urls(self, domain: str) -> List[str]:
         """發現可能的 sitemap URL"""
-        common_paths = [
-            '/sitemap.xml',
-            '/sitemap_index.xml',
-            '/sitemaps.xml',
-            '/sitemap/sitemap.xml',
-            '/wp-sitemap.xml',
-            '/sitemap1.xml'
-        ]
-        
-        return [urljoin(domain, path) for path in common_paths]
+        return [urljoin(domain, path) for path in _COMMON_SITEMAP_PATHS]
     
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
-    async def _fetch_content(self, url: str) -> Optional[str]:
-        """獲取 URL 內容"""
+    @_fetch_retry
+    async def _fetch_content(self, url: str, as_bytes: bool = False) -> Optional[Union[str, bytes]]:
+        """獲取 URL 內容 (as_bytes=True 時回傳原始位元組，不做文字解碼)"""
         try:
             async with self.session.get(url) as response:
                 if response.status == 200:
-                    content = await response.text()
+                    content = await (response.read() if as_bytes else response.text())
                     logger.debug(f"成功獲取內容: {url}")
                     return content
                 else:
@@ -127,8 +320,106 @@ class SitemapParser:
             logger.error(f"獲取內容失敗 {url}: {e}")
             raise
     
-    def _parse_sitemap_xml(self, content: str, sitemap_url: str) -> Tuple[List[URLInfo], List[str]]:
-        """解析 sitemap XML 內容"""
+    @_fetch_retry
+    async def _fetch_and_parse(self, url: str) -> Optional[Tuple[List[URLInfo], List[str]]]:
+        """串流下載 sitemap，邊接收邊以 XMLPullParser 解析，不保留完整內容"""
+        urls = []
+        image_urls = []
+        nested_sitemaps = []
+        try:
+            async with self.session.get(url) as response:
+                if response.status != 200:
+                    logger.warning(f"HTTP {response.status} for {url}")
+                    return None
+                
+                parser = etree.XMLPullParser(
+                    events=('end',), tag=(_URL_TAG, _SITEMAP_TAG, _IMAGE_TAG),
+                    resolve_entities=False, no_network=True
+                )
+                async for chunk in response.content.iter_chunked(_STREAM_CHUNK_SIZE):
+                    parser.feed(chunk)
+                    for _, elem in parser.read_events():
+                        self._handle_sitemap_element(elem, url, urls, image_urls, nested_sitemaps)
+                parser.close()
+                for _, elem in parser.read_events():
+                    self._handle_sitemap_element(elem, url, urls, image_urls, nested_sitemaps)
+        except etree.XMLSyntaxError as e:
+            # 格式錯誤的 sitemap 不常見，重新下載完整內容交給 BeautifulSoup
+            logger.warning(f"sitemap XML 格式錯誤，改用 BeautifulSoup 解析 {url}: {e}")
+            content = await self._fetch_content(url, as_bytes=True)
+            return self._parse_sitemap_xml_fallback(content, url) if content else None
+        except Exception as e:
+            logger.error(f"獲取內容失敗 {url}: {e}")
+            raise
+        
+        logger.debug(f"成功獲取內容: {url}")
+        
+        # 與頁面分開收集的圖片 URL 排在頁面之後
+        urls.extend(image_urls)
+        
+        logger.info(f"解析 sitemap {url}: {len(urls)} URLs, {len(nested_sitemaps)} 嵌套 sitemaps")
+        return urls, nested_sitemaps
+    
+    async def _sitemap_exists(self, url: str) -> bool:
+        """以 HEAD 探測 sitemap 是否存在，避免為不存在的常見路徑下載 404 頁面"""
+        try:
+            async with self.session.head(url, allow_redirects=True) as response:
+                # 伺服器不支援 HEAD 時保留候選，交由後續 GET 判斷
+                if response.status in (405, 501):
+                    return True
+                return response.status == 200
+        except Exception as e:
+            logger.debug(f"探測 sitemap 失敗 {url}: {e}")
+            return False
+    
+    def _handle_sitemap_element(self, elem, sitemap_url: str,
+                                urls: List[URLInfo], image_urls: List[URLInfo],
+                                nested_sitemaps: List[str]):
+        """處理 iterparse 產生的單一元素，處理完即釋放以維持記憶體用量固定"""
+        tag = etree.QName(elem).localname
+        
+        if tag == 'image':
+            # image:image 為 <url> 的子元素，只讀取內容不清除兄弟節點，避免影響所屬 <url>
+            loc = (elem.findtext('{*}loc') or '').strip()
+            if loc:
+                image_urls.append(URLInfo(url=loc, loc_type="image", source_sitemap=sitemap_url))
+            return
+        
+        loc = (elem.findtext('{*}loc') or '').strip()
+        if loc:
+            if tag == 'sitemap':
+                nested_sitemaps.append(loc)
+                logger.info(f"發現嵌套 sitemap: {loc}")
+            else:
+                url_info = URLInfo(url=loc, source_sitemap=sitemap_url)
+                
+                # 提取可選元素
+                lastmod = (elem.findtext('{*}lastmod') or '').strip()
+                if lastmod:
+                    url_info.lastmod = lastmod
+                
+                changefreq = (elem.findtext('{*}changefreq') or '').strip()
+                if changefreq:
+                    url_info.changefreq = changefreq
+                
+                priority = (elem.findtext('{*}priority') or '').strip()
+                if priority:
+                    try:
+                        url_info.priority = float(priority)
+                    except ValueError:
+                        pass
+                
+                urls.append(url_info)
+        
+        # 釋放已處理的元素與先前的兄弟節點
+        elem.clear()
+        parent = elem.getparent()
+        if parent is not None:
+            while elem.getprevious() is not None:
+                del parent[0]
+    
+    def _parse_sitemap_xml_fallback(self, content: Union[str, bytes], sitemap_url: str) -> Tuple[List[URLInfo], List[str]]:
+        """以 BeautifulSoup 解析格式不正確的 sitemap XML"""
         try:
             soup = BeautifulSoup(content, 'xml')
             urls = []
@@ -187,23 +478,25 @@ class SitemapParser:
             logger.error(f"解析 sitemap XML 失敗 {sitemap_url}: {e}")
             return [], []
     
-    async def _parse_single_sitemap(self, sitemap_url: str) -> SitemapInfo:
-        """解析單一 sitemap"""
-        if sitemap_url in self.parsed_sitemaps:
+    async def _parse_single_sitemap(self, sitemap_url: str, canonical_key: Optional[str] = None) -> SitemapInfo:
+        """解析單一 sitemap (以標準形式去重，實際下載仍使用原始 URL)"""
+        if canonical_key is None:
+            canonical_key = self._canonicalize_url(sitemap_url)
+        if canonical_key in self.parsed_sitemaps:
             logger.debug(f"Sitemap 已解析過: {sitemap_url}")
             return SitemapInfo(sitemap_url, [], [], time.time())
         
-        self.parsed_sitemaps.add(sitemap_url)
+        self.parsed_sitemaps.add(canonical_key)
         
         try:
-            content = await self._fetch_content(sitemap_url)
-            if not content:
+            parsed = await self._fetch_and_parse(sitemap_url)
+            if parsed is None:
                 return SitemapInfo(
                     sitemap_url, [], [], time.time(), 
                     error="無法獲取內容"
                 )
             
-            urls, nested_sitemaps = self._parse_sitemap_xml(content, sitemap_url)
+            urls, nested_sitemaps = parsed
             
             return SitemapInfo(
                 url=sitemap_url,
@@ -233,13 +526,9 @@ class SitemapParser:
                 self.robots_parser = robotparser.RobotFileParser()
                 self.robots_parser.parse(content.splitlines())
 
-                for line in content.split('\n'):
-                    line = line.strip()
-                    if line.lower().startswith('sitemap:'):
-                        sitemap_url = line[8:].strip()
-                        if sitemap_url:
-                            sitemaps.append(sitemap_url)
-                            logger.info(f"從 robots.txt 發現 sitemap: {sitemap_url}")
+                sitemaps = _ROBOTS_SITEMAP_RE.findall(content)
+                for sitemap_url in sitemaps:
+                    logger.info(f"從 robots.txt 發現 sitemap: {sitemap_url}")
         except Exception as e:
             logger.debug(f"無法讀取 robots.txt {robots_url}: {e}")
 
@@ -252,122 +541,159 @@ class SitemapParser:
         
         # 重置狀態
         self.parsed_sitemaps.clear()
-        self.all_urls.clear()
+        if self.url_store is not None:
+            self.url_store.close()
+        self.url_store = self._open_url_store()
         
-        # 發現 sitemap URLs
-        sitemap_urls = set()
+        # 發現 sitemap URLs：標準形式 -> 原始 URL (標準形式只作為去重鍵，
+        # 避免同一 sitemap 的不同寫法重複下載；實際請求一律使用原始 URL)
+        sitemap_urls: Dict[str, str] = {}
         
         # 1. 從 robots.txt 發現
         robots_sitemaps = await self._check_robots_txt(domain)
-        sitemap_urls.update(robots_sitemaps)
+        for url in robots_sitemaps:
+            sitemap_urls.setdefault(self._canonicalize_url(url), url)
         
-        # 2. 常見路徑發現
-        common_sitemaps = self._discover_sitemap_urls(domain)
-        sitemap_urls.update(common_sitemaps)
+        # 2. 常見路徑發現 (先以 HEAD 探測，只保留存在的路徑)
+        common_sitemaps = [
+            (key, url) for key, url in (
+                (self._canonicalize_url(url), url) for url in self._discover_sitemap_urls(domain)
+            )
+            if key not in sitemap_urls
+        ]
+        exists = await asyncio.gather(*(self._sitemap_exists(url) for _, url in common_sitemaps))
+        for (key, url), found in zip(common_sitemaps, exists):
+            if found:
+                sitemap_urls.setdefault(key, url)
         
         # 如果沒有發現任何 sitemap，嘗試主要的
         if not sitemap_urls:
-            sitemap_urls.add(urljoin(domain, '/sitemap.xml'))
+            url = urljoin(domain, '/sitemap.xml')
+            sitemap_urls[self._canonicalize_url(url)] = url
         
-        # 解析所有發現的 sitemap
-        pending_sitemaps = list(sitemap_urls)
-        depth = 0
+        # 解析所有發現的 sitemap：以佇列搭配固定數量的 worker，
+        # 發現的嵌套 sitemap 立即排入佇列，不需等待同層其他 sitemap 完成
+        queue: asyncio.Queue = asyncio.Queue()
+        total_urls = 0
+        for canonical_key, sitemap_url in sitemap_urls.items():
+            queue.put_nowait((canonical_key, sitemap_url, 0))
         
-        while pending_sitemaps and depth < max_depth:
-            logger.info(f"解析深度 {depth + 1}: {len(pending_sitemaps)} sitemaps")
-            
-            # 並行解析當前層的所有 sitemap
-            semaphore = asyncio.Semaphore(self.max_concurrent)
-            
-            async def parse_with_semaphore(url):
-                async with semaphore:
-                    return await self._parse_single_sitemap(url)
-            
-            tasks = [parse_with_semaphore(url) for url in pending_sitemaps]
-            sitemap_infos = await asyncio.gather(*tasks, return_exceptions=True)
-            
-            # 處理結果
-            next_level_sitemaps = []
-            for i, result in enumerate(sitemap_infos):
-                if isinstance(result, Exception):
-                    logger.error(f"解析 sitemap 異常 {pending_sitemaps[i]}: {result}")
-                    continue
-                
-                sitemap_info = result
-                if sitemap_info.error:
-                    logger.warning(f"Sitemap 解析錯誤: {sitemap_info.error}")
-                    continue
-                
-                # 收集 URLs
-                self.all_urls.extend(sitemap_info.urls)
-                
-                # 收集下一層的 sitemaps
-                for nested_url in sitemap_info.nested_sitemaps:
-                    normalized_url = self._normalize_url(nested_url, domain)
-                    if normalized_url not in self.parsed_sitemaps:
-                        next_level_sitemaps.append(normalized_url)
-            
-            pending_sitemaps = next_level_sitemaps
-            depth += 1
+        async def worker():
+            nonlocal total_urls
+            while True:
+                canonical_key, sitemap_url, depth = await queue.get()
+                try:
+                    if depth >= max_depth or canonical_key in self.parsed_sitemaps:
+                        continue
+                    
+                    logger.debug(f"解析深度 {depth + 1}: {sitemap_url}")
+                    sitemap_info = await self._parse_single_sitemap(sitemap_url, canonical_key)
+                    if sitemap_info.error:
+                        logger.warning(f"Sitemap 解析錯誤: {sitemap_info.error}")
+                        continue
+                    
+                    # 收集 URLs，寫入暫存資料庫時即以主鍵去重 (保留最先出現者)
+                    total_urls += len(sitemap_info.urls)
+                    self._store_urls(sitemap_info.urls)
+                    
+                    # 下一層的 sitemaps 直接排入佇列
+                    for nested_url in sitemap_info.nested_sitemaps:
+                        normalized_url = self._normalize_url(nested_url, domain)
+                        nested_key = self._canonicalize_url(normalized_url)
+                        if nested_key not in self.parsed_sitemaps:
+                            queue.put_nowait((nested_key, normalized_url, depth + 1))
+                except Exception as e:
+                    logger.error(f"解析 sitemap 異常 {sitemap_url}: {e}")
+                finally:
+                    queue.task_done()
+        
+        workers = [asyncio.create_task(worker()) for _ in range(self.max_concurrent)]
+        try:
+            await queue.join()
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+        
+        # 過濾 (收集時已去重)
+        unique_count = self.url_store.execute('SELECT count(*) FROM urls').fetchone()[0]
+        logger.info(f"去重: {total_urls} -> {unique_count} URLs")
         
-        # 去重和過濾
-        unique_urls = self._deduplicate_urls(self.all_urls)
-        filtered_urls = self._filter_urls(unique_urls, domain)
+        # 同域名與長度條件直接在 SQLite 中篩選，其餘規則與排序交給 _filter_urls
+        try:
+            candidates = self._load_domain_urls(urlparse(domain).netloc)
+        finally:
+            self.url_store.close()
+            self.url_store = None
+        filtered_urls = self._filter_urls(candidates, domain)
         
         logger.info(f"解析完成: 發現 {len(filtered_urls)} 個有效 URLs")
         return filtered_urls
     
-    def _deduplicate_urls(self, urls: List[URLInfo]) -> List[URLInfo]:
-        """URL 去重"""
-        seen_urls = set()
-        unique_urls = []
-        
-        for url_info in urls:
-            if url_info.url not in seen_urls:
-                seen_urls.add(url_info.url)
-                unique_urls.append(url_info)
-        
-        logger.info(f"去重: {len(urls)} -> {len(unique_urls)} URLs")
-        return unique_urls
+    def _open_url_store(self) -> sqlite3.Connection:
+        """建立 URL 暫存資料庫 (空檔名為 SQLite 的私有暫存磁碟資料庫，關閉時自動刪除)"""
+        conn = sqlite3.connect('')
+        conn.execute(
+            'CREATE TABLE urls ('
+            'url TEXT PRIMARY KEY, lastmod TEXT, changefreq TEXT, priority REAL, '
+            'loc_type TEXT, source_sitemap TEXT, netloc TEXT, path_lower TEXT)'
+        )
+        return conn
+    
+    def _store_urls(self, url_infos: List[URLInfo]):
+        """寫入 URL，重複的 URL 保留最先寫入者"""
+        self.url_store.executemany(
+            'INSERT OR IGNORE INTO urls VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+            (
+                (url_info.url, url_info.lastmod, url_info.changefreq, url_info.priority,
+                 url_info.loc_type, url_info.source_sitemap, *self._url_parts(url_info))
+                for url_info in url_infos
+            )
+        )
+    
+    def _load_domain_urls(self, domain_netloc: str) -> List[URLInfo]:
+        """讀出同域名且長度未超過上限的 URL (依寫入順序)，其餘列不會載入記憶體"""
+        rows = self.url_store.execute(
+            'SELECT url, lastmod, changefreq, priority, loc_type, source_sitemap, netloc, path_lower '
+            'FROM urls WHERE netloc = ? AND length(url) <= 200 ORDER BY rowid',
+            (domain_netloc,)
+        )
+        return [URLInfo(*row) for row in rows]
+    
+    def _url_parts(self, url_info: URLInfo) -> Tuple[str, str]:
+        """取得 URL 的主機與小寫路徑，結果快取於 URLInfo 上"""
+        if url_info.path_lower is None:
+            url_info.netloc, url_info.path_lower = _split_url(url_info.url)
+        return url_info.netloc, url_info.path_lower
     
     def _filter_urls(self, urls: List[URLInfo], domain: str) -> List[URLInfo]:
         """過濾和分類 URLs"""
-        filtered_urls = []
         domain_netloc = urlparse(domain).netloc
+        table = URLTable.from_url_infos(urls)
         
-        # 過濾規則
-        exclude_extensions = {'.pdf', '.jpg', '.jpeg', '.png', '.gif', '.bmp', 
-                            '.css', '.js', '.ico', '.xml', '.txt', '.zip'}
-        exclude_patterns = {'admin', 'wp-admin', 'login', 'register', 'api/'}
+        # 只保留同域名的 URL，並排除過長的 URL (可能是動態生成的)
+        mask = (table.netlocs == domain_netloc) & (table.url_lengths <= 200)
+        table = table[mask]
         
-        for url_info in urls:
-            parsed_url = urlparse(url_info.url)
-
-            # 只保留同域名的 URL
-            if parsed_url.netloc != domain_netloc:
-                continue
-
-            # robots.txt 規則檢查
-            if not self._is_url_allowed(url_info.url):
-                continue
-            
-            # 排除特定副檔名
-            path_lower = parsed_url.path.lower()
-            if any(path_lower.endswith(ext) for ext in exclude_extensions):
-                continue
-            
-            # 排除特定模式
-            if any(pattern in path_lower for pattern in exclude_patterns):
-                continue
-            
-            # 排除過長的 URL (可能是動態生成的)
-            if len(url_info.url) > 200:
-                continue
-            
-            filtered_urls.append(url_info)
+        # 排除特定副檔名與路徑模式，同一次掃描記下分類供 categorize_urls 使用
+        keep = np.empty(len(table), dtype=bool)
+        for i, (url_info, path) in enumerate(zip(table.infos, table.paths)):
+            keep[i], url_info.category = _classify_path(path)
+        table = table[keep]
         
-        # 按優先級排序
-        filtered_urls.sort(key=self._get_url_priority, reverse=True)
+        # robots.txt 規則檢查 (成本最高，只對前面篩選後的 URL 執行)
+        if self.robots_parser:
+            table = table[np.fromiter(
+                (self._is_url_allowed(url) for url in table.urls), dtype=bool, count=len(table)
+            )]
+        
+        # 按優先級排序：先計算成陣列再以穩定排序取得順序
+        priorities = np.fromiter(
+            (self._get_url_priority(url_info) for url_info in table.infos),
+            dtype=np.float64, count=len(table)
+        )
+        table = table[np.argsort(-priorities, kind='stable')]
+        filtered_urls = table.to_list()
         
         logger.info(f"過濾: {len(urls)} -> {len(filtered_urls)} URLs")
         return filtered_urls
@@ -377,14 +703,14 @@ class SitemapParser:
         priority = url_info.priority or 0.5
         
         # 根據 URL 路徑調整優先級
-        path = urlparse(url_info.url).path.lower()
+        path = self._url_parts(url_info)[1]
         
         # 首頁最高優先級
-        if path in ['', '/']:
+        if path in _HOMEPAGE_PATHS:
             priority += 0.5
         
         # 主要頁面較高優先級
-        if any(keyword in path for keyword in ['about', 'service', 'product', 'contact']):
+        if any(keyword in path for keyword in _PRIORITY_KEYWORDS):
             priority += 0.2
         
         # 深層頁面較低優先級
@@ -405,20 +731,10 @@ class SitemapParser:
         }
         
         for url_info in urls:
-            path = urlparse(url_info.url).path.lower()
-            
-            if path in ['', '/']:
-                categories['homepage'].append(url_info)
-            elif any(keyword in path for keyword in ['about', 'service', 'contact', 'help']):
-                categories['main_pages'].append(url_info)
-            elif any(keyword in path for keyword in ['product', 'item', 'detail']):
-                categories['product_pages'].append(url_info)
-            elif any(keyword in path for keyword in ['category', 'tag', 'archive']):
-                categories['category_pages'].append(url_info)
-            elif any(keyword in path for keyword in ['blog', 'news', 'article']):
-                categories['content_pages'].append(url_info)
-            else:
-                categories['other'].append(url_info)
+            category = url_info.category
+            if category is None:
+                category = _classify_path(self._url_parts(url_info)[1])[1]
+            categories[category].append(url_info)
         
         # 記錄分類統計
         for category, url_list in categories.items():
@@ -439,26 +755,34 @@ class SimpleSitemapParser:
             'User-Agent': 'Website-Analyzer-Bot/1.0 (Sitemap Parser)'
         })
     
-    def parse_sitemap_simple(self, website_url: str) -> List[str]:
-        """簡單解析 sitemap，只返回 URL 列表"""
+    def parse_sitemap_simple(self, website_url: str, limit: int = 50) -> List[str]:
+        """簡單解析 sitemap，只返回前 limit 個 URL (取滿後即停止下載與解析)"""
         domain = urlparse(website_url).scheme + "://" + urlparse(website_url).netloc
         sitemap_url = urljoin(domain, '/sitemap.xml')
+        urls = []
         
         try:
-            response = self.session.get(sitemap_url, timeout=self.timeout)
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.content, 'xml')
-                urls = []
-                
-                for url_elem in soup.find_all('url'):
-                    loc = url_elem.find('loc')
-                    if loc and loc.text:
-                        urls.append(loc.text.strip())
-                
-                logger.info(f"簡單解析發現 {len(urls)} URLs")
-                return urls[:50]  # 限制數量
+            with self.session.get(sitemap_url, timeout=self.timeout, stream=True) as response:
+                if response.status_code == 200:
+                    # 直接從連線串流解析，gzip 壓縮的回應交由 urllib3 解壓
+                    response.raw.decode_content = True
+                    events = etree.iterparse(
+                        response.raw, events=('end',), tag=_URL_TAG,
+                        resolve_entities=False, no_network=True
+                    )
+                    for _, elem in events:
+                        loc = (elem.findtext('{*}loc') or '').strip()
+                        if loc:
+                            urls.append(loc)
+                            if len(urls) >= limit:
+                                break
+                        elem.clear()
+                    
+                    logger.info(f"簡單解析發現 {len(urls)} URLs")
+                    return urls
             
         except Exception as e:
             logger.error(f"簡單解析失敗 {sitemap_url}: {e}")
+            return urls
         
         return []